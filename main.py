@@ -17,7 +17,11 @@ from config import get_settings, Settings
 import logging
 import time
 
-# Configure application logger
+# Configure logging once for the application; library modules only create their loggers
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
 logger = logging.getLogger(__name__)
 
 @timing_decorator("app_startup")
@@ -32,6 +36,10 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database initialization failed: {str(e)}")
         raise
 
+    warm_up_start = time.time()
+    account_scorer.warm_up()
+    PerformanceMonitor.record_metric("heuristics_warm_up_time", time.time() - warm_up_start)
+
     settings = get_settings()
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     logger.info(f"Environment: CORS Origins configured for {settings.CORS_ORIGINS}")
@@ -144,7 +152,7 @@ async def analyze_user(
             comments_df['body'].tolist() if not comments_df.empty else []
         )
         final_score, component_scores = account_scorer.calculate_score(
-            user_data, activity_patterns, text_metrics
+            user_data, activity_patterns, text_metrics, username=username
         )
 
         # Store analysis result in database
@@ -98,7 +98,7 @@ def perform_analysis(username, reddit_analyzer, text_analyzer, account_scorer, r
 
         logger.debug("Calculating final score...")
         final_score, component_scores = account_scorer.calculate_score(
-            user_data, activity_patterns, text_metrics)
+            user_data, activity_patterns, text_metrics, username=username)
         logger.debug(f"Final score: {final_score}")
         logger.debug(f"Component scores: {component_scores}")
 
@@ -0,0 +1,278 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from time import monotonic
+import numpy as np
+from utils.heuristics import (
+    AccountAgeHeuristic,
+    KarmaHeuristic,
+    EngagementHeuristic,
+    LinguisticHeuristic,
+    PostingBehaviorHeuristic,
+    SubredditHeuristic,
+    UsernameHeuristic,
+    Comment,
+    as_comments,
+    comment_arrays
+)
+from utils.heuristics.linguistic import _tokenize_cached
+from utils.heuristics.subreddit_distribution import _is_promotional_name
+from utils.heuristics.username import _compile_patterns
+from utils.scoring import AccountScorer
+import logging
+
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def sample_heuristic_data(sample_user_data):
+    """Fixture providing user data with converted comment records"""
+    base_time = datetime.now(timezone.utc) - timedelta(days=3)
+    raw_comments = [
+        {
+            'created_utc': base_time + timedelta(minutes=10 * i),
+            'parent_created_utc': base_time + timedelta(minutes=10 * i, seconds=-45),
+            'score': i,
+            'subreddit': 'python',
+            'body': f"Comment number {i} about something."
+        }
+        for i in range(10)
+    ]
+    return {**sample_user_data, 'comments': as_comments(raw_comments)}
+
+class TestHeuristics:
+    def test_as_comments(self):
+        """Test conversion of raw comment dicts into Comment records"""
+        comments = as_comments([{'score': '3', 'body': 'hi'}, Comment(score=1.0)])
+        assert all(isinstance(c, Comment) for c in comments)
+        assert comments[0].score == 3.0
+        assert comments[0].created_utc is None
+        assert comments[1].score == 1.0
+        logger.info("Comment conversion test passed")
+
+    @pytest.mark.parametrize('heuristic_class', [
+        KarmaHeuristic, AccountAgeHeuristic, EngagementHeuristic, LinguisticHeuristic,
+        PostingBehaviorHeuristic, SubredditHeuristic
+    ])
+    def test_raw_dict_comments(self, heuristic_class, sample_heuristic_data):
+        """Test heuristics accept raw comment dicts as well as Comment records"""
+        raw_data = {**sample_heuristic_data, 'comments': [c._asdict() for c in sample_heuristic_data['comments']]}
+        heuristic = heuristic_class()
+
+        raw_result = heuristic.analyze(raw_data)
+        record_result = heuristic.analyze(sample_heuristic_data)
+        assert raw_result['metrics'] == pytest.approx(record_result['metrics'])
+        raw_scores = {k: v for k, v in raw_result.items() if k != 'metrics'}
+        record_scores = {k: v for k, v in record_result.items() if k != 'metrics'}
+        assert raw_scores == pytest.approx(record_scores)
+        assert heuristic.analyze_batch([raw_data])[0]['metrics'] == pytest.approx(record_result['metrics'])
+        logger.info(f"{heuristic_class.__name__} raw comment test passed")
+
+    def test_analyze_cached(self, sample_heuristic_data):
+        """Test per-user result caching keyed on the cache key and data fingerprint"""
+        heuristic = KarmaHeuristic()
+        first = heuristic.analyze_cached(sample_heuristic_data, 'test_user')
+        second = heuristic.analyze_cached(sample_heuristic_data, 'test_user')
+        assert first == second
+        assert first is not second
+        assert len(heuristic._result_cache) == 1
+
+        changed = {**sample_heuristic_data, 'link_karma': 10}
+        heuristic.analyze_cached(changed, 'test_user')
+        heuristic.analyze_cached(sample_heuristic_data, 'other_user')
+        assert len(heuristic._result_cache) == 3
+        logger.info("Heuristic result cache test passed")
+
+    def test_analyze_cached_copies_and_expiry(self, sample_heuristic_data, monkeypatch):
+        """Test cached results are isolated from callers, expire, and need a cache key"""
+        heuristic = KarmaHeuristic()
+        calls = []
+        analyze = heuristic.analyze
+        monkeypatch.setattr(heuristic, 'analyze', lambda data: calls.append(1) or analyze(data))
+
+        first = heuristic.analyze_cached(sample_heuristic_data, 'test_user')
+        first['metrics']['recent_karma_ratio'] = -1.0
+        assert heuristic.analyze_cached(sample_heuristic_data, 'test_user')['metrics']['recent_karma_ratio'] != -1.0
+        assert len(calls) == 1
+
+        expired = monotonic() + heuristic.result_cache_ttl + 1
+        monkeypatch.setattr('utils.heuristics.base.monotonic', lambda: expired)
+        heuristic.analyze_cached(sample_heuristic_data, 'test_user')
+        assert len(calls) == 2
+        assert len(heuristic._result_cache) == 1
+
+        heuristic.analyze_cached(sample_heuristic_data)
+        assert len(calls) == 3
+        assert len(heuristic._result_cache) == 1
+        logger.info("Heuristic result cache isolation test passed")
+
+    def test_analyze_cached_concurrent(self, sample_heuristic_data):
+        """Test the result cache stays bounded and consistent under concurrent use"""
+        heuristic = KarmaHeuristic()
+        heuristic.result_cache_size = 16
+        keys = [f"user_{i % 40}" for i in range(800)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda key: heuristic.analyze_cached(sample_heuristic_data, key), keys))
+
+        assert all(result == results[0] for result in results)
+        assert len(heuristic._result_cache) == heuristic.result_cache_size
+        logger.info("Concurrent heuristic result cache test passed")
+
+    def test_scorer_username_only_keys_cache(self, sample_heuristic_data):
+        """Test the username passed to calculate_score keys the caches without changing scores"""
+        user_data = {key: value for key, value in sample_heuristic_data.items() if key != 'username'}
+        uncached = AccountScorer().calculate_score(user_data, {}, {})
+
+        scorer = AccountScorer()
+        assert scorer.calculate_score(user_data, {}, {}, username='Bot1234') == uncached
+        assert scorer.calculate_score(user_data, {}, {}, username='Bot1234') == uncached
+        assert all(len(h._result_cache) == 1 for h in scorer.heuristics.values())
+        logger.info("Scorer cache key test passed")
+
+    @pytest.mark.parametrize('heuristic_class', [
+        KarmaHeuristic, AccountAgeHeuristic, PostingBehaviorHeuristic, SubredditHeuristic
+    ])
+    def test_analyze_batch_matches_analyze(self, heuristic_class, sample_heuristic_data):
+        """Test vectorized batch analysis agrees with per-user analysis"""
+        old_account = {
+            **sample_heuristic_data,
+            'created_utc': datetime.now(timezone.utc) - timedelta(days=400),
+            'comment_karma': 5,
+            'link_karma': 200000
+        }
+        users = [sample_heuristic_data, old_account, {**sample_heuristic_data, 'comments': []}]
+        heuristic = heuristic_class()
+
+        batch = heuristic.analyze_batch(users)
+        single = [heuristic.analyze(user) for user in users]
+
+        assert len(batch) == len(single)
+        for batch_result, single_result in zip(batch, single):
+            assert batch_result['metrics'] == pytest.approx(single_result['metrics'])
+            batch_scores = {k: v for k, v in batch_result.items() if k != 'metrics'}
+            single_scores = {k: v for k, v in single_result.items() if k != 'metrics'}
+            assert batch_scores == pytest.approx(single_scores)
+        logger.info(f"{heuristic_class.__name__} batch analysis test passed")
+
+    def test_analyze_many(self, sample_heuristic_data):
+        """Test analyze_many caches small batches and vectorizes large ones"""
+        heuristic = KarmaHeuristic()
+        small = heuristic.analyze_many([sample_heuristic_data] * 3, cache_keys=['test_user'] * 3)
+        assert len(heuristic._result_cache) == 1
+
+        users = [{**sample_heuristic_data, 'link_karma': i} for i in range(heuristic.batch_min_size)]
+        large = heuristic.analyze_many(users)
+        assert len(large) == len(users)
+        assert large[0]['karma_score'] == pytest.approx(heuristic.analyze(users[0])['karma_score'])
+        assert small[0] == heuristic.analyze(sample_heuristic_data)
+        assert len(heuristic._result_cache) == 1
+        logger.info("Heuristic analyze_many test passed")
+
+    def test_karma_recent_ratio(self, sample_heuristic_data):
+        """Test recent karma ratio uses comment scores"""
+        result = KarmaHeuristic().analyze(sample_heuristic_data)
+        assert 0 <= result['karma_score'] <= 1.0
+        assert result['metrics']['recent_karma_ratio'] == pytest.approx(45 / 1500)
+        logger.info(f"Karma heuristic test passed: {result}")
+
+    def test_recent_scores_by_creation_time(self):
+        """Test recent karma uses the newest comments regardless of list order"""
+        now = datetime.now(timezone.utc)
+        comments = as_comments([
+            {'created_utc': now - timedelta(hours=i), 'score': 1 if i < 50 else 100}
+            for i in range(60)
+        ])
+        # Newest-first and oldest-first orderings select the same 50 comments
+        assert comment_arrays(comments)['recent_scores'].sum() == 50
+        assert comment_arrays(comments[::-1])['recent_scores'].sum() == 50
+        logger.info("Recent scores ordering test passed")
+
+    def test_account_age_active_days(self, sample_heuristic_data):
+        """Test active day counting on comment records"""
+        result = AccountAgeHeuristic().analyze(sample_heuristic_data)
+        assert result['metrics']['active_days'] >= 1.0
+        logger.info(f"Account age heuristic test passed: {result}")
+
+    def test_engagement_response_times(self, sample_heuristic_data):
+        """Test response time metrics on comment records"""
+        result = EngagementHeuristic().analyze(sample_heuristic_data)
+        assert result['metrics']['avg_response_time'] == pytest.approx(45.0)
+        assert result['metrics']['conversation_depth'] == 10.0
+        logger.info(f"Engagement heuristic test passed: {result}")
+
+    def test_linguistic_similarity(self):
+        """Test trigram Jaccard similarity scoring across comments"""
+        heuristic = LinguisticHeuristic()
+        repeated = ["Buy this amazing product right now"] * 4
+        varied = [
+            "The weather was lovely at the lake today",
+            "I think the second season was much better",
+            "Has anyone tried compiling this on ARM boards",
+            "My cat knocked the plant off the shelf again"
+        ]
+        assert heuristic._analyze_similarity(repeated) == 0.3
+        assert heuristic._analyze_similarity(varied) == 0.9
+        assert heuristic._analyze_similarity(["Too short", "Also short"]) == 0.8
+        logger.info("Linguistic similarity test passed")
+
+    def test_username_patterns(self):
+        """Test every overlapping suspicious pattern is reported"""
+        heuristic = UsernameHeuristic()
+        result = heuristic.analyze({'username': 'Bot1234'})
+        assert result['metrics']['pattern_matches'] == [r'\d{4,}', r'bot\d*']
+        assert result['username_score'] == pytest.approx(0.64)
+        assert heuristic.analyze({'username': 'alice'})['metrics']['pattern_matches'] == []
+
+        users = [{'username': name} for name in ['Bot1234', 'alice', 'x', '', 'Qw3rTy_Zx9_Lp0_Mn7_Vb2']]
+        batch = heuristic.analyze_batch(users)
+        for batch_result, user in zip(batch, users):
+            single_result = heuristic.analyze(user)
+            assert batch_result['metrics']['entropy'] == pytest.approx(single_result['metrics']['entropy'])
+            assert batch_result['username_score'] == single_result['username_score']
+
+        heuristic.suspicious_patterns = [r'alice']
+        assert heuristic.analyze({'username': 'Alice'})['metrics']['pattern_matches'] == ['alice']
+        assert heuristic.analyze({'username': 'Bot1234'})['metrics']['pattern_matches'] == []
+        logger.info("Username pattern test passed")
+
+    def test_invalid_input_returns_defaults(self, sample_heuristic_data):
+        """Test explicit input validation returns neutral defaults"""
+        assert KarmaHeuristic().analyze({'comment_karma': 'n/a'})['karma_score'] == 0.5
+        numeric_strings = {'comment_karma': '1500', 'link_karma': '250.5'}
+        assert KarmaHeuristic().analyze(numeric_strings) == KarmaHeuristic().analyze(
+            {'comment_karma': 1500, 'link_karma': 250.5}
+        )
+        assert KarmaHeuristic().analyze_batch([numeric_strings])[0]['metrics']['total_karma'] == 1750.5
+        assert AccountAgeHeuristic().analyze({})['age_score'] == 0.8
+        naive = {**sample_heuristic_data, 'created_utc': datetime.now()}
+        assert AccountAgeHeuristic().analyze(naive)['metrics']['account_age_days'] == 0.0
+        assert EngagementHeuristic().analyze({'comments': 'oops'})['depth_score'] == 0.8
+        logger.info("Heuristic input validation test passed")
+
+    def test_malformed_comments(self, sample_heuristic_data):
+        """Test malformed comment fields are coerced instead of failing the whole score"""
+        comments = [c._asdict() for c in sample_heuristic_data['comments']]
+        comments.append({'created_utc': 'yesterday', 'score': 'n/a', 'subreddit': 'python', 'body': 'Hi.'})
+        converted = as_comments(comments + [None])
+        assert len(converted) == len(comments)
+        assert converted[-1].score == 0.0
+        assert np.isnan(comment_arrays(converted)['created_utc'][-1])
+
+        score, components = AccountScorer().calculate_score(
+            {**sample_heuristic_data, 'comments': comments}, {}, {}
+        )
+        assert 0.0 <= score <= 1.0
+        assert 'karma_karma_score' in components
+        assert 'engagement_depth_score' in components
+        logger.info("Malformed comment test passed")
+
+    def test_scorer_warm_up(self):
+        """Test warm up fills the compiled pattern and memo caches without filling the result cache"""
+        memo_caches = (_compile_patterns, _is_promotional_name, _tokenize_cached)
+        for cached in memo_caches:
+            cached.cache_clear()
+
+        scorer = AccountScorer()
+        scorer.warm_up()
+        assert all(cached.cache_info().currsize > 0 for cached in memo_caches)
+        assert all(not getattr(h, '_result_cache', None) for h in scorer.heuristics.values())
+        logger.info("Scorer warm up test passed")
@@ -1,6 +1,7 @@
 import pytest
 import numpy as np
-from utils.ml_analyzer import MLAnalyzer
+from sklearn.ensemble import RandomForestClassifier
+from utils.ml_analyzer import MLAnalyzer, _pack_forest, _forest_risk
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,57 @@ class TestMLAnalyzer:
         assert len(self.analyzer.training_features) > 0
         assert len(self.analyzer.training_labels) > 0
         logger.info("Training example addition test passed")
+
+    def test_retrain_schedule(self, sample_user_data):
+        """Test the model is refit only when the example count doubles"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        text_metrics = {'vocab_size': 100, 'avg_word_length': 5}
+
+        for i in range(4):
+            self.analyzer.add_training_example(sample_user_data, activity_patterns, text_metrics, i % 2 == 0)
+        assert not self.analyzer.is_trained
+
+        self.analyzer.add_training_example(sample_user_data, activity_patterns, text_metrics, False)
+        assert self.analyzer.is_trained
+        assert self.analyzer._next_fit_at == 10
+
+        for i in range(5):
+            self.analyzer.add_training_example(sample_user_data, activity_patterns, text_metrics, i % 2 == 0)
+        assert self.analyzer._next_fit_at == 20
+        logger.info("Retrain schedule test passed")
+
+    def test_add_training_examples_bulk(self, sample_user_data):
+        """Test bulk training examples match one-by-one extraction and fit once"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        examples = [
+            ({**sample_user_data, 'link_karma': 10 * i}, activity_patterns, {'vocab_size': 100 + i})
+            for i in range(40)
+        ]
+        labels = [i % 3 != 0 for i in range(40)]
+
+        assert self.analyzer.add_training_examples_bulk(examples, labels)
+        assert self.analyzer.is_trained
+        assert self.analyzer._next_fit_at == 80
+        assert list(self.analyzer.training_labels) == [0 if legit else 1 for legit in labels]
+
+        expected = np.vstack([MLAnalyzer().extract_features(*example) for example in examples])
+        assert np.allclose(self.analyzer.training_features, expected)
+        assert not self.analyzer.add_training_examples_bulk(examples, labels[:-1])
+        logger.info("Bulk training example test passed")
+
+    def test_malformed_training_examples_dropped(self, sample_user_data):
+        """Test examples whose features cannot be extracted are not stored"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        malformed = ({**sample_user_data, 'comment_karma': 'n/a'}, activity_patterns, {})
+
+        assert not self.analyzer.add_training_example(*malformed)
+        assert len(self.analyzer.training_labels) == 0
+
+        examples = [(sample_user_data, activity_patterns, {}), malformed, (sample_user_data, activity_patterns, {})]
+        assert self.analyzer.add_training_examples_bulk(examples, [True, False, False])
+        assert list(self.analyzer.training_labels) == [0, 1]
+        assert self.analyzer.training_features.any(axis=1).all()
+        logger.info("Malformed training example test passed")
         
     def test_extract_features(self, sample_user_data):
         """Test feature extraction"""
@@ -49,6 +101,23 @@ class TestMLAnalyzer:
         assert isinstance(features, np.ndarray)
         assert features.shape[1] == 12  # Number of features
         logger.info("Feature extraction test passed")
+
+    def test_extract_features_epoch_created(self, sample_user_data):
+        """Test created_utc given as epoch seconds matches the datetime form"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        text_metrics = {'vocab_size': 100, 'avg_word_length': 5}
+        epoch_data = {**sample_user_data, 'created_utc': sample_user_data['created_utc'].timestamp()}
+
+        features = self.analyzer.extract_features(sample_user_data, activity_patterns, text_metrics)
+        epoch_features = self.analyzer.extract_features(epoch_data, activity_patterns, text_metrics)
+
+        assert np.array_equal(features, epoch_features)
+
+        # Naive datetimes are read as UTC, not local time
+        naive_data = {**sample_user_data, 'created_utc': sample_user_data['created_utc'].replace(tzinfo=None)}
+        naive_features = self.analyzer.extract_features(naive_data, activity_patterns, text_metrics)
+        assert np.array_equal(features, naive_features)
+        logger.info("Epoch created_utc feature test passed")
         
     def test_analyze_account(self, sample_user_data):
         """Test account analysis"""
@@ -64,3 +133,50 @@ class TestMLAnalyzer:
         assert isinstance(risk_score, float)
         assert 0 <= risk_score <= 1.0
         logger.info(f"Account analysis test passed with risk score: {risk_score}")
+
+    def test_analyze_accounts(self, sample_user_data):
+        """Test batched account analysis agrees with per-account analysis"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        text_metrics = {'vocab_size': 100, 'avg_word_length': 5}
+        accounts = [(sample_user_data, activity_patterns, text_metrics)] * 3
+
+        results = self.analyzer.analyze_accounts(accounts)
+
+        assert len(results) == len(accounts)
+        expected = self.analyzer.analyze_account(*accounts[0])
+        for risk_score, feature_importance in results:
+            assert risk_score == pytest.approx(expected[0])
+            assert feature_importance == pytest.approx(expected[1])
+        logger.info(f"Batched account analysis test passed with {len(results)} results")
+
+    def test_analyze_accounts_malformed_row(self, sample_user_data):
+        """Test a malformed account is scored as the training mean, like extract_features"""
+        activity_patterns = {'unique_subreddits': 5, 'avg_score': 10}
+        examples = [
+            ({**sample_user_data, 'link_karma': 10 * i}, activity_patterns, {'vocab_size': 100 + i})
+            for i in range(20)
+        ]
+        self.analyzer.add_training_examples_bulk(examples, [i % 2 == 0 for i in range(20)])
+        malformed = ({**sample_user_data, 'comment_karma': 'n/a'}, activity_patterns, {})
+
+        results = self.analyzer.analyze_accounts([examples[0], malformed])
+
+        assert not self.analyzer.extract_features(*malformed).any()
+        mean_risk = self.analyzer.predict_risk_scores(np.zeros((1, 12)))[0]
+        assert results[1][0] == pytest.approx(mean_risk)
+        assert results[1][0] == pytest.approx(self.analyzer.analyze_account(*malformed)[0])
+        assert results[0][0] == pytest.approx(self.analyzer.analyze_account(*examples[0])[0])
+        logger.info("Malformed batched account test passed")
+
+    def test_packed_forest_matches_model(self):
+        """Test the flattened forest reproduces predict_proba exactly"""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(60, 12))
+        y = rng.integers(0, 2, 60)
+        forest = RandomForestClassifier(n_estimators=20, max_depth=10, random_state=42).fit(X, y)
+
+        packed = _pack_forest(forest)
+        rows = rng.normal(size=(10, 12))
+        np.testing.assert_array_equal(_forest_risk(packed, rows), forest.predict_proba(rows)[:, 1])
+        np.testing.assert_array_equal(_forest_risk(packed, rows[:1]), forest.predict_proba(rows[:1])[:, 1])
+        logger.info("Packed forest inference test passed")
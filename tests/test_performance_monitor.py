@@ -0,0 +1,69 @@
+import threading
+import pytest
+from datetime import datetime
+from utils.performance_monitor import MetricSeries, PerformanceMonitor, TIMING_ENABLED, timing_decorator
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TestPerformanceMonitor:
+    def test_metric_series_wraparound(self, monkeypatch):
+        """Test the ring buffer keeps the newest samples in oldest-first order"""
+        monkeypatch.setattr(MetricSeries, 'max_samples', 3)
+        series = MetricSeries()
+        for i in range(7):
+            series.append(float(i), 1_700_000_000.0 + i)
+
+        assert len(series) == 3
+        assert series.latest() == 6.0
+        records = series.as_records()
+        assert [record['value'] for record in records] == [4.0, 5.0, 6.0]
+        assert records[0]['timestamp'] == datetime.fromtimestamp(1_700_000_004.0)
+        logger.info("Metric series wraparound test passed")
+
+    def test_get_metrics_returns_snapshot(self, monkeypatch):
+        """Test get_metrics returns bounded oldest-first copies of the samples"""
+        monkeypatch.setattr(MetricSeries, 'max_samples', 2)
+        for value in (1.0, 2.0, 3.0):
+            PerformanceMonitor.record_metric('test_snapshot_metric', value)
+
+        snapshot = PerformanceMonitor.get_metrics('test_snapshot_metric')
+        assert [record['value'] for record in snapshot] == [2.0, 3.0]
+        snapshot.clear()
+        assert len(PerformanceMonitor.get_metrics('test_snapshot_metric')) == 2
+        assert PerformanceMonitor.get_latest_metrics()['test_snapshot_metric'] == 3.0
+        assert PerformanceMonitor.get_metrics('test_unknown_metric') == []
+        logger.info("Metric snapshot test passed")
+
+    @pytest.mark.skipif(not TIMING_ENABLED, reason="timing disabled with ML_PERF=0")
+    def test_concurrent_timing(self):
+        """Test overlapping calls from two threads each record a sample"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        @timing_decorator('test_concurrent_operation')
+        def timed():
+            # Both threads are inside the operation at the same time
+            barrier.wait()
+
+        threads = [threading.Thread(target=timed) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(PerformanceMonitor.get_metrics('test_concurrent_operation')) == 2
+        assert 'test_concurrent_operation' not in PerformanceMonitor.active_operations()
+        logger.info("Concurrent timing test passed")
+
+    @pytest.mark.skipif(not TIMING_ENABLED, reason="timing disabled with ML_PERF=0")
+    def test_nested_timing(self):
+        """Test nested calls of an operation already being timed record one sample"""
+        @timing_decorator('test_nested_operation')
+        def timed(depth):
+            assert 'test_nested_operation' in PerformanceMonitor.active_operations()
+            return timed(depth - 1) if depth else 'done'
+
+        assert timed(3) == 'done'
+        assert len(PerformanceMonitor.get_metrics('test_nested_operation')) == 1
+        assert PerformanceMonitor.active_operations() == {}
+        logger.info("Nested timing test passed")
@@ -0,0 +1,60 @@
+import pytest
+from utils.rate_limiter import RateLimiter, TokenBucket, _EPOCH_OFFSET
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TestRateLimiter:
+    def test_bucket_lru_eviction(self):
+        """Test the least recently seen client's bucket is evicted past max_clients"""
+        limiter = RateLimiter(tokens=5, fill_rate=0.1, max_clients=3)
+        for client in ['a', 'b', 'c']:
+            limiter.check_rate_limit(client, now=0)
+
+        # Seeing 'a' again makes 'b' the least recently seen client
+        limiter.check_rate_limit('a', now=0)
+        limiter.check_rate_limit('d', now=0)
+
+        assert len(limiter.buckets) == limiter.max_clients
+        assert list(limiter.buckets) == ['c', 'a', 'd']
+        assert limiter.buckets['a'].tokens == 3
+        logger.info("Rate limiter LRU eviction test passed")
+
+    def test_full_bucket_stays_full(self):
+        """Test idle time does not push a full bucket past capacity"""
+        bucket = TokenBucket(tokens=5, fill_rate=0.1)
+        bucket.last_update = 0
+
+        assert bucket.consume(now=3600 * 10**9)
+        assert bucket.tokens == 4
+        assert bucket.last_update == 3600 * 10**9
+        logger.info("Full bucket test passed")
+
+    def test_partial_refill(self):
+        """Test a partially drained bucket refills by elapsed time times fill rate"""
+        bucket = TokenBucket(tokens=5, fill_rate=0.1)
+        bucket.last_update = 0
+
+        assert bucket.consume(tokens=4, now=0)
+        assert bucket.tokens == 1
+        # 15 seconds at 0.1 tokens/s adds 1.5 tokens before taking one
+        assert bucket.consume(now=15 * 10**9)
+        assert bucket.tokens == pytest.approx(1.5)
+        assert not bucket.consume(tokens=2, now=15 * 10**9)
+        logger.info("Partial refill test passed")
+
+    def test_reset_header_uses_same_sample(self):
+        """Test the reset headers derive from the monotonic sample passed in"""
+        limiter = RateLimiter(tokens=1, fill_rate=0.5)
+        now = 1_000 * 10**9
+
+        allowed, headers = limiter.check_rate_limit('client', now=now)
+        assert allowed
+        assert headers['X-RateLimit-Remaining'] == '0'
+        assert headers['X-RateLimit-Reset'] == str(int(_EPOCH_OFFSET + 1_000 + 2))
+
+        allowed, headers = limiter.check_rate_limit('client', now=now)
+        assert not allowed
+        assert headers['Retry-After'] == '2'
+        assert headers['X-RateLimit-Reset'] == str(int(_EPOCH_OFFSET + 1_000 + 2))
+        logger.info("Rate limit reset header test passed")
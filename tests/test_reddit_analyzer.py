@@ -0,0 +1,91 @@
+import pytest
+import threading
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import utils.reddit_analyzer as reddit_analyzer_module
+from utils.reddit_analyzer import RedditAnalyzer
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FakeReddit:
+    """Stand-in for praw.Reddit that fails if two threads use it at once"""
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.thread_ids = set()
+        self.busy = threading.Lock()
+        FakeReddit.instances.append(self)
+
+    def redditor(self, username):
+        if not self.busy.acquire(blocking=False):
+            raise RuntimeError("Reddit client used from two threads at once")
+        try:
+            self.thread_ids.add(threading.get_ident())
+            time.sleep(0.01)  # Hold the client so concurrent workers overlap
+        finally:
+            self.busy.release()
+        now = datetime.now(timezone.utc).timestamp()
+        comment = SimpleNamespace(created_utc=now - 60, score=1, subreddit='python', body='Hello there.')
+        return SimpleNamespace(
+            created_utc=now - 86400,
+            comment_karma=len(username),
+            link_karma=1,
+            comments=SimpleNamespace(new=lambda limit=None: [comment]),
+            submissions=SimpleNamespace(new=lambda limit=None: [])
+        )
+
+class TestRedditAnalyzer:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        """Setup RedditAnalyzer with dummy credentials"""
+        monkeypatch.setenv('REDDIT_CLIENT_ID', 'test_id')
+        monkeypatch.setenv('REDDIT_CLIENT_SECRET', 'test_secret')
+        self.analyzer = RedditAnalyzer()
+
+    def test_get_user_data_bulk(self, monkeypatch):
+        """Test bulk fetching keys results by username, deduplicates and skips failures"""
+        calls = []
+
+        def fake_get_user_data(username):
+            calls.append(username)
+            if username == 'missing_user':
+                raise Exception(f"User '{username}' not found")
+            return {'comment_karma': len(username)}, pd.DataFrame(), pd.DataFrame()
+
+        monkeypatch.setattr(self.analyzer, 'get_user_data', fake_get_user_data)
+        results = self.analyzer.get_user_data_bulk(['alice', 'bob', 'missing_user', 'alice'])
+
+        assert list(results) == ['alice', 'bob']
+        assert results['bob'][0] == {'comment_karma': 3}
+        assert sorted(calls) == ['alice', 'bob', 'missing_user']
+        assert self.analyzer.get_user_data_bulk([]) == {}
+        logger.info("Bulk user data test passed")
+
+    def test_get_user_data_bulk_thread_clients(self, monkeypatch):
+        """Test bulk fetching gives every worker thread its own Reddit client"""
+        monkeypatch.setattr(reddit_analyzer_module.praw, 'Reddit', FakeReddit)
+        monkeypatch.setattr(RedditAnalyzer, '_thread_clients', threading.local())
+        monkeypatch.setattr(FakeReddit, 'instances', [])
+        usernames = [f"bulk_user_{i}" for i in range(16)]
+
+        results = self.analyzer.get_user_data_bulk(usernames, max_workers=4)
+
+        assert list(results) == usernames
+        assert results['bulk_user_10'][0]['comment_karma'] == 12
+        assert len(results['bulk_user_10'][1]) == 1
+        assert 1 < len(FakeReddit.instances) <= 4
+        assert all(len(client.thread_ids) == 1 for client in FakeReddit.instances)
+        logger.info("Bulk thread client test passed")
+
+    def test_cache_concurrent_writes(self):
+        """Test caching from many threads keeps every entry"""
+        usernames = [f"user_{i}" for i in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda name: self.analyzer._cache_data(name, (name,)), usernames))
+
+        assert all(self.analyzer._get_cached_data(name) == (name,) for name in usernames)
+        logger.info("Concurrent cache test passed")
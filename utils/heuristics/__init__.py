@@ -1,3 +1,4 @@
+from .base import Comment, as_comments, comment_arrays
 from .account_age import AccountAgeHeuristic
 from .karma import KarmaHeuristic
 from .username import UsernameHeuristic
@@ -13,5 +14,8 @@ __all__ = [
     'PostingBehaviorHeuristic',
     'SubredditHeuristic',
     'EngagementHeuristic',
-    'LinguisticHeuristic'
+    'LinguisticHeuristic',
+    'Comment',
+    'as_comments',
+    'comment_arrays'
 ]
@@ -1,70 +1,133 @@
 from datetime import datetime, timezone
-from typing import Dict, Any
-from .base import BaseHeuristic
+from numbers import Real
+from typing import Dict, Any, List, Sequence
+import numpy as np
+from .base import BaseHeuristic, normalize_scores, to_epoch
+
+def _analyze_core(account_age_days, post_count, recent_activity, historical_activity):
+    """Account age score math on floats or equally shaped float arrays (no dict access)
+
+    Returns (age_score, post_rate, recent_activity_ratio).
+    """
+    post_rate = post_count / np.maximum(1, account_age_days)
+
+    # Base age score (newer accounts are more suspicious), normalized to 1 year
+    age_score = normalize_scores(account_age_days / 365)
+
+    # More than 50 posts per day on an account less than a month old
+    age_score = np.where((account_age_days < 30) & (post_rate > 50), age_score * 0.5, age_score)
+
+    # Sudden activity on an account 6 months or older
+    mature = account_age_days > 180
+    age_score = np.where(mature & (historical_activity == 0) & (recent_activity > 0),
+                         age_score * 0.7, age_score)
+    recent_ratio = np.where(mature, recent_activity / np.maximum(1, historical_activity + recent_activity), 0.0)
+    return age_score, post_rate, recent_ratio
 
 class AccountAgeHeuristic(BaseHeuristic):
     """Analyzes account age patterns"""
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            account_age = datetime.now(timezone.utc) - data['created_utc']
-            account_age_days = float(account_age.days)
-
-            # Calculate metrics
-            post_rate = float(len(data.get('comments', [])) / max(1, account_age_days))
-            active_days = self._get_active_days(data.get('comments', []))
-
-            # Base age score (newer accounts are more suspicious)
-            age_score = float(self.normalize_score(account_age_days / 365))  # Normalize to 1 year
-
-            # Check for high volume in new accounts
-            if account_age_days < 30:  # Account less than a month old
-                if post_rate > 50:  # More than 50 posts per day
-                    age_score *= 0.5  # Increase suspicion
-
-            # Check for sudden activity changes
-            if account_age_days > 180:  # 6 months or older
-                recent_activity = float(len([d for d in active_days 
-                    if (datetime.now(timezone.utc) - d).days <= 30]))
-                historical_activity = float(len([d for d in active_days 
-                    if (datetime.now(timezone.utc) - d).days > 30]))
-
-                if historical_activity == 0 and recent_activity > 0:
-                    age_score *= 0.7  # Suspicious sudden activity
-
-            # Store metrics separately
-            metrics = {
-                'account_age_days': float(account_age_days),
+        if not self._valid_created_utc(data.get('created_utc')):
+            return self._get_default_scores()
+
+        now_ts = datetime.now(timezone.utc).timestamp()
+        account_age_days = float((now_ts - to_epoch(data['created_utc'])) // 86400)
+        comments = data.get('comments') or ()
+
+        if comments:
+            active_days = self._get_active_days(self.get_comment_arrays(data)['created_utc'])
+            today = int(now_ts // 86400)
+            active_count = active_days.size
+            recent_activity = float(np.count_nonzero(today - active_days <= 30))
+            historical_activity = float(active_count - recent_activity)
+        else:
+            # Fast path for accounts without comments: no activity days to collect
+            active_count = 0
+            recent_activity = historical_activity = 0.0
+
+        age_score, post_rate, recent_ratio = _analyze_core(
+            account_age_days, float(len(comments)), recent_activity, historical_activity
+        )
+
+        # Store metrics separately
+        return {
+            'age_score': float(age_score),
+            'metrics': {
+                'account_age_days': account_age_days,
                 'post_frequency': float(post_rate),
-                'active_days': float(len(active_days)),
-                'recent_activity_ratio': float(
-                    recent_activity / max(1, historical_activity + recent_activity)
-                    if 'recent_activity' in locals() else 0.0
-                )
+                'active_days': float(active_count),
+                'recent_activity_ratio': float(recent_ratio)
             }
+        }
 
-            return {
-                'age_score': float(age_score),
-                'metrics': metrics
-            }
+    def _valid_created_utc(self, created_utc: Any) -> bool:
+        """Check created_utc is an aware datetime or an epoch timestamp"""
+        if isinstance(created_utc, datetime):
+            return created_utc.tzinfo is not None
+        return isinstance(created_utc, Real) and not isinstance(created_utc, bool)
+
+    def _get_active_days(self, created_utc: np.ndarray) -> np.ndarray:
+        """Get unique days with activity as sorted UTC day numbers"""
+        timestamps = created_utc[~np.isnan(created_utc)]
+        return np.unique((timestamps // 86400).astype(np.int64))
+
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vectorized analyze() over many users"""
+        if not all(self._valid_created_utc(u.get('created_utc')) for u in users):
+            # Fall back to the per-user path, which returns defaults for malformed input
+            return super().analyze_batch(users)
+
+        n = len(users)
+        now_ts = datetime.now(timezone.utc).timestamp()
+        created = np.fromiter((to_epoch(u['created_utc']) for u in users), dtype=np.float64, count=n)
+        created_lists = [self.get_comment_arrays(u)['created_utc'] for u in users]
+        comment_counts = np.fromiter((len(u.get('comments') or ()) for u in users), dtype=np.float64, count=n)
+
+        account_age_days = (now_ts - created) // 86400
 
-        except Exception as e:
-            # Return safe defaults
-            return {
-                'age_score': 0.8,
+        # Unique (user, day) pairs for the whole batch: one lexsort, then drop repeats
+        comment_groups = np.repeat(np.arange(n), [c.size for c in created_lists])
+        timestamps = np.concatenate(created_lists) if n else np.empty(0)
+        valid = ~np.isnan(timestamps)
+        all_days = (timestamps[valid] // 86400).astype(np.int64)
+        groups = comment_groups[valid]
+        order = np.lexsort((all_days, groups))
+        all_days, groups = all_days[order], groups[order]
+        first = np.ones(all_days.size, dtype=bool)
+        first[1:] = (all_days[1:] != all_days[:-1]) | (groups[1:] != groups[:-1])
+        all_days, groups = all_days[first], groups[first]
+        active_counts = np.bincount(groups, minlength=n)
+
+        today = int(now_ts // 86400)
+        recent_activity = np.bincount(groups, weights=(today - all_days <= 30), minlength=n)
+        historical_activity = active_counts - recent_activity
+
+        age_scores, post_rate, recent_ratio = _analyze_core(
+            account_age_days, comment_counts, recent_activity, historical_activity
+        )
+
+        return [
+            {
+                'age_score': float(age_scores[i]),
                 'metrics': {
-                    'account_age_days': 0.0,
-                    'post_frequency': 0.0,
-                    'active_days': 0.0,
-                    'recent_activity_ratio': 0.0
+                    'account_age_days': float(account_age_days[i]),
+                    'post_frequency': float(post_rate[i]),
+                    'active_days': float(active_counts[i]),
+                    'recent_activity_ratio': float(recent_ratio[i])
                 }
             }
+            for i in range(n)
+        ]
 
-    def _get_active_days(self, comments):
-        """Get unique days with activity"""
-        try:
-            return sorted(set(comment['created_utc'].date() 
-                            for comment in comments 
-                            if 'created_utc' in comment))
-        except Exception:
-            return []
\ No newline at end of file
+    def _get_default_scores(self) -> Dict[str, Any]:
+        """Return neutral default scores"""
+        return {
+            'age_score': 0.8,
+            'metrics': {
+                'account_age_days': 0.0,
+                'post_frequency': 0.0,
+                'active_days': 0.0,
+                'recent_activity_ratio': 0.0
+            }
+        }
@@ -1,16 +1,118 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from bisect import bisect_left, bisect_right
+from collections import namedtuple, OrderedDict
+from datetime import datetime
+import threading
+from time import monotonic
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Lightweight comment record used by all heuristics. Built once upstream so the
+# heuristics read fields via attribute access instead of per-item dict.get().
+Comment = namedtuple(
+    'Comment',
+    'created_utc score subreddit body parent_created_utc',
+    defaults=(None, 0.0, '', '', None)
+)
+
+def _to_float(value: Any) -> float:
+    """Convert a numeric value to float (0.0 when missing or malformed)"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def as_comments(items: Iterable[Any]) -> List[Comment]:
+    """Convert raw comment dicts into Comment records (already converted items pass through)
+
+    Malformed fields do not raise: a bad score becomes 0.0 and a bad timestamp
+    NaN (see to_epoch); items that are not dicts are skipped.
+    """
+    return [
+        item if isinstance(item, Comment) else Comment(
+            created_utc=item.get('created_utc'),
+            score=_to_float(item.get('score')),
+            subreddit=item.get('subreddit', ''),
+            body=item.get('body', ''),
+            parent_created_utc=item.get('parent_created_utc')
+        )
+        for item in items
+        if isinstance(item, (Comment, dict))
+    ]
+
+def to_epoch(value: Any) -> float:
+    """Convert a datetime or numeric timestamp to epoch seconds (NaN when missing or malformed)"""
+    if value is None:
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+# Number of most recent comments whose scores count as recent karma
+RECENT_COMMENT_LIMIT = 50
+
+def comment_arrays(comments: Sequence[Comment]) -> Dict[str, np.ndarray]:
+    """Build parallel per-field arrays (structure of arrays) from Comment records
+
+    'recent_scores' additionally holds the scores of the RECENT_COMMENT_LIMIT
+    newest comments by created_utc (comments without a timestamp sort last).
+    """
+    n = len(comments)
+    created_utc = np.fromiter((to_epoch(c.created_utc) for c in comments), dtype=np.float64, count=n)
+    score = np.fromiter((c.score for c in comments), dtype=np.float64, count=n)
+    newest_first = np.argsort(-created_utc, kind='stable')[:RECENT_COMMENT_LIMIT]
+    return {
+        'created_utc': created_utc,
+        'score': score,
+        'parent_created_utc': np.fromiter((to_epoch(c.parent_created_utc) for c in comments),
+                                          dtype=np.float64, count=n),
+        'recent_scores': score[newest_first]
+    }
+
+def threshold_lookup(value: float, thresholds: np.ndarray, table: np.ndarray, side: str = 'right') -> float:
+    """Map a value to table[i] where i is its bucket among the sorted thresholds"""
+    # bisect matches np.searchsorted for scalars without its per-call dispatch cost;
+    # NaN sorts last as it does in NumPy
+    if value != value:
+        return float(table[-1])
+    bisect = bisect_left if side == 'left' else bisect_right
+    return float(table[bisect(thresholds, value)])
+
+def normalize_scores(values, min_val: float = 0.0, max_val: float = 1.0):
+    """Vectorized normalize_score: clip scores to [min_val, max_val], in place for arrays"""
+    if isinstance(values, np.ndarray):
+        return np.clip(values, min_val, max_val, out=values)
+    return np.clip(values, min_val, max_val)
 
 class BaseHeuristic(ABC):
     """Base class for all heuristics"""
 
+    # Maximum number of per-user results kept by analyze_cached
+    result_cache_size = 4096
+
+    # Seconds a cached result stays valid; scores depend on the current time (account age,
+    # recent activity), so entries expire like RedditAnalyzer's 5 minute user data cache
+    result_cache_ttl = 300.0
+
+    # Guards every heuristic's result cache; the API scores users from concurrent threads
+    _result_cache_lock = threading.Lock()
+
+    # Smallest batch for which analyze_many uses the vectorized analyze_batch
+    batch_min_size = 64
+
     @abstractmethod
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze data and return scores
 
         Args:
-            data: Dictionary containing relevant data for analysis
+            data: Dictionary containing relevant data for analysis. The
+                  'comments' entry is a list of Comment records or raw comment
+                  dicts (see as_comments) and 'comment_arrays' optionally holds
+                  their comment_arrays().
 
         Returns:
             Dictionary containing:
@@ -19,6 +121,78 @@ class BaseHeuristic(ABC):
         """
         pass
 
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze several users at once; heuristics override this with a vectorized path"""
+        return [self.analyze(data) for data in users]
+
+    def analyze_many(self, users: Sequence[Dict[str, Any]],
+                     cache_keys: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Analyze many users, vectorizing large batches and reusing cached results for small ones"""
+        if len(users) < self.batch_min_size:
+            keys = cache_keys if cache_keys is not None else [None] * len(users)
+            return [self.analyze_cached(data, key) for data, key in zip(users, keys)]
+        return self.analyze_batch(users)
+
+    def fingerprint(self, data: Dict[str, Any]) -> Tuple:
+        """Cheap identity of a user's data, combined with the caller's cache key by analyze_cached"""
+        return (
+            data.get('comment_karma'),
+            data.get('link_karma'),
+            data.get('created_utc'),
+            len(data.get('comments') or ()),
+            len(data.get('submissions') or ())
+        )
+
+    def analyze_cached(self, data: Dict[str, Any], cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Return analyze(data), reusing an unexpired result for the same cache key and fingerprint
+
+        cache_key identifies the account (e.g. its username). Data without one is not
+        cached, since different accounts could share every fingerprinted field.
+        """
+        if not cache_key:
+            return self.analyze(data)
+
+        key = (cache_key,) + self.fingerprint(data)
+        with self._result_cache_lock:
+            cache = self.__dict__.get('_result_cache')
+            if cache is None:
+                cache = self._result_cache = OrderedDict()
+            entry = cache.get(key)
+            if entry is not None and entry[0] > monotonic():
+                cache.move_to_end(key)
+                result = entry[1]
+            else:
+                result = None
+
+        if result is None:
+            # Analyze outside the lock so threads scoring different users do not serialize
+            result = self.analyze(data)
+            with self._result_cache_lock:
+                cache[key] = (monotonic() + self.result_cache_ttl, result)
+                cache.move_to_end(key)
+                if len(cache) > self.result_cache_size:
+                    cache.popitem(last=False)
+
+        # Copy the scores and their metrics so callers cannot alter the cached result
+        copied = dict(result)
+        if isinstance(copied.get('metrics'), dict):
+            copied['metrics'] = {
+                name: value.copy() if isinstance(value, (list, dict)) else value
+                for name, value in copied['metrics'].items()
+            }
+        return copied
+
+    def get_comments(self, data: Dict[str, Any]) -> List[Comment]:
+        """Return the user's comments as Comment records, converting raw comment dicts"""
+        return as_comments(data.get('comments') or ())
+
+    def get_comment_arrays(self, data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Return the precomputed comment arrays, building them if the caller did not"""
+        arrays = data.get('comment_arrays')
+        if arrays is None:
+            arrays = comment_arrays(self.get_comments(data))
+        return arrays
+
     def normalize_score(self, value: float, min_val: float = 0, max_val: float = 1) -> float:
         """Normalize score to range [0,1]"""
-        return float(max(min_val, min(max_val, value)))
\ No newline at end of file
+        return float(max(min_val, min(max_val, value)))
@@ -1,61 +1,94 @@
-from typing import Dict, Any
-from .base import BaseHeuristic
+from typing import Dict, Any, List, Sequence
+import numpy as np
+from .base import BaseHeuristic, normalize_scores
+
+# Score modifier tables: bucket i of the thresholds selects multiplier i.
+# Upper bounds are strict comparisons, hence the nextafter() nudge.
+_TOTAL_KARMA_THRESHOLDS = np.array([10.0, np.nextafter(100000.0, np.inf)])
+_TOTAL_KARMA_MULTIPLIERS = np.array([0.6, 1.0, 0.8])  # <10 karma, normal, >100k karma
+_LINK_RATIO_THRESHOLDS = np.array([0.1, np.nextafter(0.9, np.inf)])
+_LINK_RATIO_MULTIPLIERS = np.array([0.9, 1.0, 0.7])  # <10% link, normal, >90% link
+_RECENT_RATIO_THRESHOLDS = np.array([np.nextafter(0.5, np.inf)])
+_RECENT_RATIO_MULTIPLIERS = np.array([1.0, 0.8])  # >50% of karma from recent posts
+
+def _analyze_core(comment_karma, link_karma, recent_karma):
+    """Karma score math on floats or equally shaped float arrays (no dict access)
+
+    Returns (karma_score, total_karma, link_ratio, recent_karma_ratio).
+    """
+    total_karma = np.maximum(1.0, comment_karma + link_karma)
+    link_ratio = link_karma / total_karma
+    recent_ratio = recent_karma / total_karma
+
+    # Base score normalized to 10k karma, then the pattern modifiers
+    karma_score = normalize_scores(total_karma / 10000) * (
+        _TOTAL_KARMA_MULTIPLIERS[np.searchsorted(_TOTAL_KARMA_THRESHOLDS, total_karma, side='right')]
+        * _LINK_RATIO_MULTIPLIERS[np.searchsorted(_LINK_RATIO_THRESHOLDS, link_ratio, side='right')]
+        * _RECENT_RATIO_MULTIPLIERS[np.searchsorted(_RECENT_RATIO_THRESHOLDS, recent_ratio, side='right')]
+    )
+    return karma_score, total_karma, link_ratio, recent_ratio
 
 class KarmaHeuristic(BaseHeuristic):
     """Analyzes karma patterns and trophy history"""
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, float]:
         try:
-            # Initialize scores dictionary
-            scores = {}
-
-            # Safely extract karma values with type conversion
             comment_karma = float(data.get('comment_karma', 0))
             link_karma = float(data.get('link_karma', 0))
-            total_karma = max(1.0, comment_karma + link_karma)
+        except (TypeError, ValueError):
+            return self._get_default_scores()
+
+        # Karma earned by the most recent comments
+        recent_karma = float(self.get_comment_arrays(data)['recent_scores'].sum())
 
-            # Calculate the base karma score
-            base_score = self.normalize_score(total_karma / 10000)  # Normalize to 10k karma
-            scores['karma_score'] = float(base_score)
+        karma_score, total_karma, link_ratio, recent_ratio = _analyze_core(
+            comment_karma, link_karma, recent_karma
+        )
 
-            # Extract metrics separately
-            metrics = {
+        # Store metrics separately from scores
+        return {
+            'karma_score': float(karma_score),
+            'metrics': {
                 'total_karma': float(total_karma),
-                'link_ratio': float(link_karma / total_karma if total_karma > 0 else 0.0),
-                'recent_karma_ratio': 0.0  # Default value
+                'link_ratio': float(link_ratio),
+                'recent_karma_ratio': float(recent_ratio)
             }
+        }
 
-            # Calculate recent karma ratio if comments are available
-            if data.get('comments'):
-                recent_karma = sum(float(c.get('score', 0)) for c in data['comments'][-50:])
-                metrics['recent_karma_ratio'] = float(recent_karma / total_karma if total_karma > 0 else 0.0)
-
-            # Apply score modifiers based on patterns
-            if total_karma > 100000:  # Extremely high karma
-                scores['karma_score'] *= 0.8
-            elif total_karma < 10:  # Extremely low karma
-                scores['karma_score'] *= 0.6
-
-            if metrics['link_ratio'] > 0.9:  # Over 90% link karma
-                scores['karma_score'] *= 0.7
-            elif metrics['link_ratio'] < 0.1:  # Less than 10% link karma
-                scores['karma_score'] *= 0.9
-
-            if metrics['recent_karma_ratio'] > 0.5:  # 50% of karma from recent posts
-                scores['karma_score'] *= 0.8
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vectorized analyze() over many users"""
+        n = len(users)
+        try:
+            comment_karma = np.fromiter((float(u.get('comment_karma', 0)) for u in users), dtype=np.float64, count=n)
+            link_karma = np.fromiter((float(u.get('link_karma', 0)) for u in users), dtype=np.float64, count=n)
+        except (TypeError, ValueError):
+            # Fall back to the per-user path, which returns defaults for malformed input
+            return super().analyze_batch(users)
 
-            # Store metrics separately from scores
-            scores['metrics'] = metrics
+        recent_karma = np.fromiter((self.get_comment_arrays(u)['recent_scores'].sum() for u in users),
+                                   dtype=np.float64, count=n)
 
-            return scores
+        karma_scores, total_karma, link_ratio, recent_ratio = _analyze_core(comment_karma, link_karma, recent_karma)
 
-        except Exception as e:
-            # Return safe defaults if any error occurs
-            return {
-                'karma_score': 0.5,  # Neutral score
+        return [
+            {
+                'karma_score': float(karma_scores[i]),
                 'metrics': {
-                    'total_karma': 0.0,
-                    'link_ratio': 0.0,
-                    'recent_karma_ratio': 0.0
+                    'total_karma': float(total_karma[i]),
+                    'link_ratio': float(link_ratio[i]),
+                    'recent_karma_ratio': float(recent_ratio[i])
                 }
-            }
\ No newline at end of file
+            }
+            for i in range(n)
+        ]
+
+    def _get_default_scores(self) -> Dict[str, Any]:
+        """Return neutral default scores"""
+        return {
+            'karma_score': 0.5,
+            'metrics': {
+                'total_karma': 0.0,
+                'link_ratio': 0.0,
+                'recent_karma_ratio': 0.0
+            }
+        }
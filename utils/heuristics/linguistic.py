@@ -1,50 +1,122 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import re
+from functools import lru_cache
 from collections import Counter
 import numpy as np
-from nltk.tokenize import word_tokenize
-from nltk.util import ngrams
-from .base import BaseHeuristic
+from scipy.sparse import csr_matrix, triu
+from .base import BaseHeuristic, threshold_lookup
+
+# Words and individual punctuation marks, roughly what nltk's word_tokenize
+# yields but without sentence splitting or the Punkt model
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+# One match per non-blank run of text between periods (a "sentence")
+_SENTENCE_RE = re.compile(r'[^.\s][^.]*')
+
+# Characters that make a suspicious pattern a regex rather than a plain phrase
+_REGEX_META_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# Punctuation marks counted by the style analysis; _WORD_RE yields each as its own token
+_STYLE_PUNCTUATION = frozenset('.,!?;:')
+
+# Per-comment counts collected by LinguisticHeuristic._summarize, in order
+_SUMMARY_FIELDS = ('words', 'sentences', 'word_chars', 'punctuation', 'characters', 'pattern_hits')
+
+# Phrases typical of templated or promotional comments
+_SUSPICIOUS_PATTERNS = {
+    'template_phrases': [
+        r'thanks for sharing',
+        r'great post',
+        r'nice work',
+        r'check out',
+        r'click here'
+    ],
+    'promotional_language': [
+        r'discount',
+        r'offer',
+        r'limited time',
+        r'best price',
+        r'check out my'
+    ]
+}
+_ALL_PATTERNS = tuple(p for patterns in _SUSPICIOUS_PATTERNS.values() for p in patterns)
+
+# The patterns are plain phrases, so a lowercase substring test finds them
+# faster than a regex search; compiled regexes are kept as the fallback
+# should a pattern ever use regex syntax
+if any(_REGEX_META_RE.search(p) for p in _ALL_PATTERNS):
+    _PATTERN_PHRASES = None
+    _COMPILED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in _ALL_PATTERNS)
+else:
+    _PATTERN_PHRASES = tuple(p.lower() for p in _ALL_PATTERNS)
+    _COMPILED_PATTERNS = None
+
+# Score tables: bucket i of the thresholds selects score i. Ladders that test
+# "value > threshold" use side='left', "value < threshold" the default 'right'.
+_SIMILARITY_THRESHOLDS = np.array([0.1, 0.3, 0.5])
+_SIMILARITY_SCORES = np.array([0.9, 0.7, 0.5, 0.3])  # natural variation ... very similar content
+_PATTERN_THRESHOLDS = np.array([0.1, 0.2, 0.3])
+_PATTERN_SCORES = np.array([0.9, 0.7, 0.5, 0.3])  # few/no matches ... high pattern matches
+_STYLE_THRESHOLDS = np.array([0.1, 0.3])
+_STYLE_SCORES = np.array([0.4, 0.6, 0.8])  # very consistent, somewhat consistent, natural variation
+
+# Largest vocabulary whose trigrams still pack into a collision-free int64
+_MAX_PACKED_VOCAB = 2 ** 21
+
+# Rows of the comment x comment overlap matrix computed at a time
+_SIMILARITY_BLOCK_ROWS = 1024
+
+# Below this many values plain Python beats NumPy's per-call dispatch overhead
+_SMALL_ARRAY_SIZE = 1000
+
+def _variance(values: np.ndarray) -> float:
+    """Population variance, computed in plain Python for small arrays"""
+    n = values.size
+    if n >= _SMALL_ARRAY_SIZE:
+        return float(np.var(values))
+    xs = values.tolist()
+    mean = sum(xs) / n
+    return sum((x - mean) * (x - mean) for x in xs) / n
+
+@lru_cache(maxsize=50_000)
+def _tokenize_cached(text_lower: str) -> Tuple[str, ...]:
+    """Tokenize one lowercased comment body, reusing the result for repeated bodies"""
+    return tuple(_WORD_RE.findall(text_lower))
 
 class LinguisticHeuristic(BaseHeuristic):
     """Analyzes linguistic patterns and writing style"""
 
     def __init__(self):
-        self.suspicious_patterns = {
-            'template_phrases': [
-                r'thanks for sharing',
-                r'great post',
-                r'nice work',
-                r'check out',
-                r'click here'
-            ],
-            'promotional_language': [
-                r'discount',
-                r'offer',
-                r'limited time',
-                r'best price',
-                r'check out my'
-            ]
-        }
+        # Patterns and their matchers are built once at import and shared
+        self.suspicious_patterns = _SUSPICIOUS_PATTERNS
+        self._pattern_phrases = _PATTERN_PHRASES
+        self._compiled_patterns = _COMPILED_PATTERNS
+        self._total_patterns = len(_ALL_PATTERNS)
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            comments = data.get('comments', [])
+            comments = self.get_comments(data)
             if not comments:
                 return self._get_default_scores()
 
-            comment_texts = [str(c.get('body', '')) for c in comments if c.get('body')]
+            comment_texts = [str(c.body) for c in comments if c.body]
             if not comment_texts:
                 return self._get_default_scores()
 
             # Initialize scores dictionary with float values
             scores = {}
 
+            # Lowercase, tokenize and summarize each comment once, shared by the analyzers and metrics
+            lowered = [text.lower() for text in comment_texts]
+            tokenized = [_tokenize_cached(text) for text in lowered]
+            summary = self._summarize_texts(comment_texts, tokenized, lowered)
+            pattern_matches = int(summary['pattern_hits'].sum())
+
             # Calculate individual scores
-            similarity_score = float(self._analyze_similarity(comment_texts))
-            complexity_score = float(self._analyze_complexity(comment_texts))
-            pattern_score = float(self._analyze_patterns(comment_texts))
-            style_score = float(self._analyze_style(comment_texts))
+            similarity_score = float(self._analyze_similarity(comment_texts, tokenized))
+            complexity_score = float(self._analyze_complexity(comment_texts, summary))
+            pattern_score = float(self._analyze_patterns(comment_texts, pattern_matches))
+            style_score = float(self._analyze_style(comment_texts, summary))
 
             # Store scores with explicit float conversion
             scores['similarity_score'] = float(similarity_score)
@@ -55,8 +127,8 @@ class LinguisticHeuristic(BaseHeuristic):
             # Store metrics separately with float conversion
             scores['metrics'] = {
                 'total_comments': float(len(comment_texts)),
-                'avg_comment_length': float(sum(len(t) for t in comment_texts) / max(1, len(comment_texts))),
-                'pattern_matches': float(self._count_pattern_matches(comment_texts))
+                'avg_comment_length': float(summary['characters'].sum() / max(1, len(comment_texts))),
+                'pattern_matches': float(pattern_matches)
             }
 
             return scores
@@ -64,75 +136,102 @@ class LinguisticHeuristic(BaseHeuristic):
         except Exception as e:
             return self._get_default_scores()
 
-    def _analyze_similarity(self, texts: List[str]) -> float:
+    def _tokenize(self, texts: List[str]) -> List[Tuple[str, ...]]:
+        """Split each text into lowercase word and punctuation tokens"""
+        return [_tokenize_cached(str(text).lower()) for text in texts]
+
+    def _analyze_similarity(self, texts: List[str], tokenized: Optional[List[Tuple[str, ...]]] = None) -> float:
         """Analyze similarity between comments"""
         if len(texts) < 2:
             return 0.8
 
         try:
-            # Create n-grams for each text
-            text_ngrams = []
-            for text in texts:
-                tokens = word_tokenize(str(text).lower())
-                if tokens:
-                    text_ngrams.append(set(ngrams(tokens, 3)))  # Use trigrams
-
-            if len(text_ngrams) < 2:
+            if tokenized is None:
+                tokenized = self._tokenize(texts)
+            token_lists = [tokens for tokens in tokenized if tokens]
+            if len(token_lists) < 2:
                 return 0.8
 
-            # Calculate average similarity
-            similarities = []
-            for i in range(len(text_ngrams)):
-                for j in range(i + 1, len(text_ngrams)):
-                    if text_ngrams[i] and text_ngrams[j]:
-                        union_size = len(text_ngrams[i] | text_ngrams[j])
-                        if union_size > 0:
-                            similarity = float(len(text_ngrams[i] & text_ngrams[j]) / union_size)
-                            similarities.append(similarity)
-
-            if not similarities:
+            # Texts too short for a trigram take no part in any pair
+            token_lists = [tokens for tokens in token_lists if len(tokens) >= 3]
+            if len(token_lists) < 2:
                 return 0.8
 
-            avg_similarity = float(np.mean(similarities))
+            trigram_rows, trigram_ids = self._encode_trigrams(token_lists)
+
+            # Binary text x trigram matrix: X @ X.T holds pairwise intersection sizes
+            X = csr_matrix((np.ones(trigram_ids.size, dtype=np.int64), (trigram_rows, trigram_ids)),
+                           shape=(len(token_lists), int(trigram_ids.max()) + 1))
+            X.data[:] = 1  # duplicate trigrams within a text were summed
+
+            # Only pairs sharing a trigram appear in the sparse X @ X.T; every
+            # other pair has similarity 0, so the mean never needs the dense N x N.
+            # The product is taken a block of rows at a time so memory stays
+            # bounded when common trigrams make it nearly dense.
+            sizes = np.asarray(X.sum(axis=1)).ravel()
+            X_t = X.T.tocsr()
+            similarity_sum = 0.0
+            for start in range(0, X.shape[0], _SIMILARITY_BLOCK_ROWS):
+                # Keep each pair once: global column > global row
+                overlaps = triu(X[start:start + _SIMILARITY_BLOCK_ROWS] @ X_t, k=start + 1).tocoo()
+                unions = sizes[overlaps.row + start] + sizes[overlaps.col] - overlaps.data
+                similarity_sum += float((overlaps.data / unions).sum())
+
+            # Average Jaccard similarity over all distinct pairs
+            num_pairs = len(token_lists) * (len(token_lists) - 1) // 2
+            avg_similarity = similarity_sum / num_pairs
 
             # Return appropriate score based on similarity
-            if avg_similarity > 0.5:  # Very similar content
-                return 0.3
-            elif avg_similarity > 0.3:  # Moderately similar
-                return 0.5
-            elif avg_similarity > 0.1:  # Some similarity
-                return 0.7
-            return 0.9  # Natural variation
+            return threshold_lookup(avg_similarity, _SIMILARITY_THRESHOLDS, _SIMILARITY_SCORES, side='left')
 
         except Exception as e:
             return 0.8
 
-    def _analyze_complexity(self, texts: List[str]) -> float:
+    def _encode_trigrams(self, token_lists: List[Tuple[str, ...]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode each text's word trigrams as (text row, trigram id) integer arrays"""
+        vocab = {}
+        token_ids = np.fromiter(
+            (vocab.setdefault(token, len(vocab)) for tokens in token_lists for token in tokens),
+            dtype=np.int64
+        )
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        offsets = np.cumsum(lengths) - lengths
+
+        # Trigram start positions in the flat token array, never crossing a text boundary
+        counts = lengths - 2
+        rows = np.repeat(np.arange(len(token_lists)), counts)
+        first_trigram = np.cumsum(counts) - counts
+        starts = offsets[rows] + np.arange(rows.size) - first_trigram[rows]
+        first, second, third = token_ids[starts], token_ids[starts + 1], token_ids[starts + 2]
+        if len(vocab) < _MAX_PACKED_VOCAB:
+            # Pack each trigram into one exact int64 code and dedupe a flat array
+            codes = (first * len(vocab) + second) * len(vocab) + third
+            _, trigram_ids = np.unique(codes, return_inverse=True)
+        else:
+            _, trigram_ids = np.unique(np.stack((first, second, third), axis=1), axis=0, return_inverse=True)
+        return rows, trigram_ids.ravel()
+
+    def _analyze_complexity(self, texts: List[str], summary: Optional[Dict[str, np.ndarray]] = None) -> float:
         """Analyze text complexity"""
         if not texts:
             return 0.8
 
         try:
-            # Calculate average sentence length and word length
-            avg_sent_lengths = []
-            avg_word_lengths = []
+            if summary is None:
+                summary = self._summarize_texts(texts, self._tokenize(texts))
 
-            for text in texts:
-                text = str(text)
-                sentences = [s for s in text.split('.') if s.strip()]
-                words = [w for w in word_tokenize(text) if w.strip()]
+            # Calculate average sentence length and word length per text
+            words = summary['words']
+            sentences = summary['sentences']
+            has_words = words > 0
+            has_sentences = has_words & (sentences > 0)
 
-                if sentences and words:
-                    avg_sent_lengths.append(float(len(words)) / float(len(sentences)))
-                if words:
-                    avg_word_lengths.append(float(np.mean([len(w) for w in words])))
-
-            if not avg_sent_lengths or not avg_word_lengths:
+            if not has_sentences.any() or not has_words.any():
                 return 0.8
 
             # Score based on variance and averages with explicit float conversion
-            sent_length_var = float(np.var(avg_sent_lengths))
-            word_length_var = float(np.var(avg_word_lengths))
+            sent_length_var = _variance(words[has_sentences] / sentences[has_sentences])
+            word_length_var = _variance(summary['word_chars'][has_words] / words[has_words])
 
             if sent_length_var < 1 and word_length_var < 0.5:  # Very uniform
                 return 0.4
@@ -143,66 +242,47 @@ class LinguisticHeuristic(BaseHeuristic):
         except Exception as e:
             return 0.8
 
-    def _analyze_patterns(self, texts: List[str]) -> float:
-        """Analyze presence of suspicious patterns"""
+    def _analyze_patterns(self, texts: List[str], pattern_matches: Optional[int] = None) -> float:
+        """Analyze presence of suspicious patterns (pattern_matches may be precomputed)"""
         if not texts:
             return 0.8
 
         try:
-            pattern_matches = float(self._count_pattern_matches(texts))
-            total_patterns = float(len(self.suspicious_patterns['template_phrases']) + \
-                           len(self.suspicious_patterns['promotional_language']))
+            if pattern_matches is None:
+                pattern_matches = self._count_pattern_matches(texts)
+            total_patterns = float(self._total_patterns)
 
             if total_patterns == 0:
                 return 0.8
 
             pattern_ratio = float(pattern_matches) / (float(max(1, len(texts))) * total_patterns)
 
-            if pattern_ratio > 0.3:  # High pattern matches
-                return 0.3
-            elif pattern_ratio > 0.2:  # Moderate matches
-                return 0.5
-            elif pattern_ratio > 0.1:  # Some matches
-                return 0.7
-            return 0.9  # Few/no matches
+            return threshold_lookup(pattern_ratio, _PATTERN_THRESHOLDS, _PATTERN_SCORES, side='left')
 
         except Exception as e:
             return 0.8
 
-    def _analyze_style(self, texts: List[str]) -> float:
+    def _analyze_style(self, texts: List[str], summary: Optional[Dict[str, np.ndarray]] = None) -> float:
         """Analyze consistency of writing style"""
         if len(texts) < 3:
             return 0.8
 
         try:
-            # Calculate stylometric features
-            features = []
-            for text in texts:
-                try:
-                    words = word_tokenize(str(text))
-                    if not words:
-                        continue
-
-                    # Calculate basic stylometric features with explicit float conversion
-                    avg_word_length = float(np.mean([len(w) for w in words]))
-                    punct_ratio = float(len([c for c in text if c in '.,!?;:'])) / float(max(1, len(text)))
-
-                    features.append([avg_word_length, punct_ratio])
-                except:
-                    continue
-
-            if len(features) < 3:  # Need at least 3 samples for meaningful analysis
+            if summary is None:
+                summary = self._summarize_texts(texts, self._tokenize(texts))
+
+            # Calculate stylometric features: average word length and punctuation ratio
+            has_words = summary['words'] > 0
+            word_lengths = summary['word_chars'][has_words] / summary['words'][has_words]
+            punct_ratios = summary['punctuation'][has_words] / np.maximum(1, summary['characters'][has_words])
+
+            if word_lengths.size < 3:  # Need at least 3 samples for meaningful analysis
                 return 0.8
 
-            # Calculate feature variance with explicit float conversion
-            feature_var = np.var(features, axis=0)
-            avg_var = float(np.mean(feature_var))
+            # Average of the two feature variances
+            avg_var = (_variance(word_lengths) + _variance(punct_ratios)) / 2
 
-            if avg_var < 0.1:  # Very consistent style
-                return 0.4
-            elif avg_var < 0.3:  # Somewhat consistent
-                return 0.6
-            return 0.8  # Natural variation
+            return threshold_lookup(avg_var, _STYLE_THRESHOLDS, _STYLE_SCORES)
 
         except Exception as e:
             return 0.8
@@ -223,11 +303,37 @@ class LinguisticHeuristic(BaseHeuristic):
 
     def _count_pattern_matches(self, texts: List[str]) -> int:
         """Count total pattern matches across all texts"""
-        count = 0
-        for text in texts:
-            text_lower = str(text).lower()
-            for pattern_list in self.suspicious_patterns.values():
-                for pattern in pattern_list:
-                    if re.search(pattern, text_lower):
-                        count += 1
-        return count
\ No newline at end of file
+        return sum(self._count_text_patterns(str(text).lower()) for text in texts)
+
+    def _count_text_patterns(self, text_lower: str) -> int:
+        """Count how many distinct suspicious patterns occur in one lowercased text"""
+        if self._pattern_phrases is None:
+            return sum(1 for pattern in self._compiled_patterns if pattern.search(text_lower))
+        return sum(1 for phrase in self._pattern_phrases if phrase in text_lower)
+
+    def _summarize(self, text: str, text_lower: str, tokens: Tuple[str, ...]) -> Tuple[int, int, int, int, int, int]:
+        """Walk one comment once, collecting every count the analyzers need
+
+        Returns (words, sentences, word_chars, punctuation, characters, pattern_hits).
+        """
+        word_chars = 0
+        punctuation = 0
+        for token in tokens:
+            word_chars += len(token)
+            if token in _STYLE_PUNCTUATION:
+                punctuation += 1
+        if '.' in text:
+            sentences = len(_SENTENCE_RE.findall(text))
+        else:
+            sentences = 1 if not text.isspace() else 0
+        return len(tokens), sentences, word_chars, punctuation, len(text), self._count_text_patterns(text_lower)
+
+    def _summarize_texts(self, texts: List[str], tokenized: List[Tuple[str, ...]],
+                         lowered: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Summarize every comment into parallel per-field count arrays"""
+        if lowered is None:
+            lowered = [str(text).lower() for text in texts]
+        rows = [self._summarize(str(text), text_lower, tokens)
+                for text, text_lower, tokens in zip(texts, lowered, tokenized)]
+        columns = np.array(rows, dtype=np.float64).reshape(len(rows), len(_SUMMARY_FIELDS)).T
+        return dict(zip(_SUMMARY_FIELDS, columns))
@@ -1,56 +1,54 @@
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List
-from .base import BaseHeuristic
+import math
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Sequence
+from .base import BaseHeuristic, threshold_lookup, to_epoch
 import numpy as np
 
+# Score tables: bucket i of the thresholds selects score i. Ladders that test
+# "value > threshold" use side='left', "value < threshold" the default 'right'.
+_FREQUENCY_THRESHOLDS = np.array([10.0, 20.0, 50.0])
+_FREQUENCY_SCORES = np.array([0.8, 0.6, 0.4, 0.2])  # normal ... extremely high posts per day
+_INTERVAL_CV_THRESHOLDS = np.array([0.1, 0.3, 0.5])
+_INTERVAL_SCORES = np.array([0.2, 0.4, 0.8, 1.0])  # very consistent intervals ... natural variation
+_SLEEP_RATIO_THRESHOLDS = np.array([0.1, 0.2])
+_TIMEZONE_SCORES = np.array([0.8, 0.6, 0.4])  # normal, 10-20%, over 20% of posts in sleep hours
+
+# Below this many intervals a plain Python loop beats NumPy's per-call overhead
+_SMALL_INTERVAL_COUNT = 20
+
 class PostingBehaviorHeuristic(BaseHeuristic):
     """Analyzes posting frequency and timing patterns"""
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        comments = data.get('comments', [])
+        submissions = data.get('submissions', [])
+        if not comments and not submissions:
+            # Nothing posted: skip building the time arrays
+            return self._get_default_scores()
+
         try:
-            # Combine comments and submissions chronologically
-            all_posts = []
-            for item in data.get('comments', []):
-                all_posts.append({
-                    'time': item.get('created_utc', datetime.now(timezone.utc)),
-                    'type': 'comment'
-                })
-            for item in data.get('submissions', []):
-                all_posts.append({
-                    'time': item.get('created_utc', datetime.now(timezone.utc)),
-                    'type': 'submission'
-                })
-
-            all_posts.sort(key=lambda x: x['time'])
-
-            if not all_posts:
-                return {
-                    'frequency_score': 0.8,  # Neutral default
-                    'interval_score': 0.8,
-                    'timezone_score': 0.8,
-                    'metrics': {
-                        'posts_per_day': 0.0,
-                        'avg_interval': 0.0,
-                        'sleep_ratio': 0.0
-                    }
-                }
+            times = self._posting_times(data, datetime.now(timezone.utc).timestamp())
+
+            if not times.size:
+                return self._get_default_scores()
 
             # Calculate metrics
-            time_diff_days = max(1, (all_posts[-1]['time'] - all_posts[0]['time']).days)
-            posts_per_day = float(len(all_posts) / time_diff_days)
+            time_diff_days = max(1, int((times[-1] - times[0]) // 86400))
+            posts_per_day = float(times.size / time_diff_days)
 
-            intervals = self._calculate_intervals([post['time'] for post in all_posts])
-            hour_distribution = self._analyze_hour_distribution([post['time'].hour for post in all_posts])
+            intervals = self._calculate_intervals(times)
+            avg_interval = float(intervals.mean()) if intervals.size else 0.0
+            hour_distribution = self._analyze_hour_distribution((times % 86400 // 3600).astype(np.int64))
 
             # Calculate scores
             frequency_score = float(self._calculate_frequency_score(posts_per_day))
-            interval_score = float(self._analyze_intervals(intervals)) if intervals else 0.8
+            interval_score = float(self._analyze_intervals(intervals, avg_interval)) if intervals.size else 0.8
             timezone_score = float(self._calculate_timezone_score(hour_distribution))
 
             # Store metrics separately
             metrics = {
                 'posts_per_day': float(posts_per_day),
-                'avg_interval': float(np.mean(intervals)) if intervals else 0.0,
+                'avg_interval': avg_interval,
                 'sleep_ratio': float(self._calculate_sleep_ratio(hour_distribution))
             }
 
@@ -63,74 +61,140 @@ class PostingBehaviorHeuristic(BaseHeuristic):
 
         except Exception as e:
             # Return safe defaults with explicit float conversion
-            return {
-                'frequency_score': 0.8,
-                'interval_score': 0.8,
-                'timezone_score': 0.8,
+            return self._get_default_scores()
+
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vectorized analyze() over many users"""
+        n = len(users)
+        now_ts = datetime.now(timezone.utc).timestamp()
+        time_lists = []
+        for data in users:
+            try:
+                times = self._posting_times(data, now_ts)
+            except Exception:
+                # Malformed input scores the defaults, as in analyze()
+                times = np.empty(0)
+            time_lists.append(times)
+
+        # Each user's times are already sorted, so the concatenation is grouped by user
+        counts = np.fromiter((times.size for times in time_lists), dtype=np.int64, count=n)
+        times = np.concatenate(time_lists) if n else np.empty(0)
+        owners = np.repeat(np.arange(n), counts)
+        active = counts > 0
+        ends = np.cumsum(counts)
+        starts = ends - counts
+
+        span_days = np.zeros(n)
+        span_days[active] = (times[ends[active] - 1] - times[starts[active]]) // 86400
+        posts_per_day = counts / np.maximum(1, span_days)
+
+        # Intervals between consecutive posts of the same user, in minutes
+        same_user = owners[1:] == owners[:-1]
+        intervals = (np.diff(times) / 60)[same_user]
+        interval_owners = owners[1:][same_user]
+        interval_counts = np.maximum(counts - 1, 0)
+        has_intervals = interval_counts > 0
+        avg_interval = np.zeros(n)
+        avg_interval[has_intervals] = (np.bincount(interval_owners, weights=intervals, minlength=n)[has_intervals]
+                                       / interval_counts[has_intervals])
+        deviations = intervals - avg_interval[interval_owners]
+        std_dev = np.sqrt(np.bincount(interval_owners, weights=deviations * deviations, minlength=n)
+                          / np.maximum(1, interval_counts))
+        regular = has_intervals & (avg_interval != 0)
+        cv = np.divide(std_dev, avg_interval, out=np.zeros(n), where=regular)
+
+        hours = (times % 86400 // 3600).astype(np.int64)
+        hour_counts = np.bincount(owners * 24 + hours, minlength=n * 24).reshape(n, 24)
+        sleep_ratio = hour_counts[:, 2:6].sum(axis=1) / np.maximum(1, counts)
+
+        frequency_scores = _FREQUENCY_SCORES[np.searchsorted(_FREQUENCY_THRESHOLDS, posts_per_day, side='left')]
+        interval_scores = np.where(regular,
+                                   _INTERVAL_SCORES[np.searchsorted(_INTERVAL_CV_THRESHOLDS, cv, side='right')], 0.8)
+        timezone_scores = _TIMEZONE_SCORES[np.searchsorted(_SLEEP_RATIO_THRESHOLDS, sleep_ratio, side='left')]
+
+        return [
+            {
+                'frequency_score': float(frequency_scores[i]),
+                'interval_score': float(interval_scores[i]),
+                'timezone_score': float(timezone_scores[i]),
                 'metrics': {
-                    'posts_per_day': 0.0,
-                    'avg_interval': 0.0,
-                    'sleep_ratio': 0.0
+                    'posts_per_day': float(posts_per_day[i]),
+                    'avg_interval': float(avg_interval[i]),
+                    'sleep_ratio': float(sleep_ratio[i])
                 }
+            } if active[i] else self._get_default_scores()
+            for i in range(n)
+        ]
+
+    def _get_default_scores(self) -> Dict[str, Any]:
+        """Return neutral default scores"""
+        return {
+            'frequency_score': 0.8,
+            'interval_score': 0.8,
+            'timezone_score': 0.8,
+            'metrics': {
+                'posts_per_day': 0.0,
+                'avg_interval': 0.0,
+                'sleep_ratio': 0.0
             }
-
-    def _calculate_intervals(self, timestamps: List[datetime]) -> List[float]:
-        """Calculate time intervals between posts in minutes"""
-        if len(timestamps) < 2:
-            return []
-        return [float((timestamps[i+1] - timestamps[i]).total_seconds() / 60)
-                for i in range(len(timestamps)-1)]
-
-    def _analyze_intervals(self, intervals: List[float]) -> float:
-        if not intervals:
+        }
+
+    def _posting_times(self, data: Dict[str, Any], now_ts: float) -> np.ndarray:
+        """Combine comment and submission times as epoch seconds, chronologically"""
+        submissions = data.get('submissions', [])
+        comment_times = self.get_comment_arrays(data)['created_utc']
+        submission_times = np.fromiter(
+            (to_epoch(item.get('created_utc', now_ts)) for item in submissions),
+            dtype=np.float64, count=len(submissions)
+        )
+        if np.isnan(submission_times).any():
+            raise ValueError("submission created_utc missing")
+        # Comments without a timestamp count as posted now. Reddit lists both
+        # reverse-chronologically, and the stable sort (timsort) merges such runs in linear time
+        return np.sort(np.concatenate((np.where(np.isnan(comment_times), now_ts, comment_times),
+                                       submission_times)), kind='stable')
+
+    def _calculate_intervals(self, timestamps: np.ndarray) -> np.ndarray:
+        """Calculate time intervals between sorted epoch timestamps in minutes"""
+        return np.diff(timestamps) / 60
+
+    def _analyze_intervals(self, intervals: np.ndarray, mean_interval: Optional[float] = None) -> float:
+        """Score the regularity of posting intervals (mean_interval may be precomputed)"""
+        if not intervals.size:
             return 0.8
 
-        std_dev = float(np.std(intervals))
-        mean_interval = float(np.mean(intervals))
-
+        if mean_interval is None:
+            mean_interval = float(intervals.mean())
         if mean_interval == 0:
             return 0.8
 
-        cv = std_dev / mean_interval  # Coefficient of variation
+        # Standard deviation around the already known mean
+        if intervals.size < _SMALL_INTERVAL_COUNT:
+            std_dev = math.sqrt(sum((x - mean_interval) ** 2 for x in intervals.tolist()) / intervals.size)
+        else:
+            deviations = intervals - mean_interval
+            std_dev = float(np.sqrt(deviations @ deviations / intervals.size))
 
-        if cv < 0.1:  # Very consistent intervals
-            return 0.2
-        elif cv < 0.3:  # Somewhat consistent
-            return 0.4
-        elif cv < 0.5:  # Natural variation
-            return 0.8
-        return 1.0
+        cv = std_dev / mean_interval  # Coefficient of variation
+        return threshold_lookup(cv, _INTERVAL_CV_THRESHOLDS, _INTERVAL_SCORES)
 
-    def _analyze_hour_distribution(self, hours: List[int]) -> Dict[int, float]:
-        """Analyze distribution of posting hours"""
-        counts = {hour: float(hours.count(hour)) for hour in range(24)}
-        total = sum(counts.values())
+    def _analyze_hour_distribution(self, hours: np.ndarray) -> np.ndarray:
+        """Analyze distribution of posting hours: share of posts per UTC hour of day (0-23)"""
+        counts = np.bincount(hours, minlength=24)
+        total = int(counts.sum())
         if total > 0:
-            return {hour: float(count / total) for hour, count in counts.items()}
-        return {hour: 0.0 for hour in range(24)}
+            return counts / total
+        return np.zeros(24)
 
-    def _calculate_sleep_ratio(self, hour_dist: Dict[int, float]) -> float:
+    def _calculate_sleep_ratio(self, hour_dist: np.ndarray) -> float:
         """Calculate ratio of posts during sleep hours (2 AM to 6 AM)"""
-        sleep_hours = set(range(2, 6))
-        sleep_posts = sum(hour_dist.get(h, 0.0) for h in sleep_hours)
-        return float(sleep_posts)
+        return float(hour_dist[2:6].sum())
 
     def _calculate_frequency_score(self, posts_per_day: float) -> float:
         """Score based on average posts per day"""
-        if posts_per_day > 50:  # Extremely high frequency
-            return 0.2
-        elif posts_per_day > 20:  # High frequency
-            return 0.4
-        elif posts_per_day > 10:  # Moderate frequency
-            return 0.6
-        return 0.8  # Normal frequency
-
-    def _calculate_timezone_score(self, hour_dist: Dict[int, float]) -> float:
+        return threshold_lookup(posts_per_day, _FREQUENCY_THRESHOLDS, _FREQUENCY_SCORES, side='left')
+
+    def _calculate_timezone_score(self, hour_dist: np.ndarray) -> float:
         """Score based on posting hour distribution"""
         sleep_ratio = self._calculate_sleep_ratio(hour_dist)
-
-        if sleep_ratio > 0.2:  # More than 20% posts during sleep hours
-            return 0.4
-        elif sleep_ratio > 0.1:  # 10-20% posts during sleep hours
-            return 0.6
-        return 0.8  # Normal sleep pattern
\ No newline at end of file
+        return threshold_lookup(sleep_ratio, _SLEEP_RATIO_THRESHOLDS, _TIMEZONE_SCORES, side='left')
\ No newline at end of file
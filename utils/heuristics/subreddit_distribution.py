@@ -1,48 +1,64 @@
-from typing import Dict, Any, List, Set
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, List, Sequence, Set, Tuple
 from collections import Counter
-from .base import BaseHeuristic
+import numpy as np
+from .base import BaseHeuristic, comment_arrays, threshold_lookup, to_epoch
+
+# Score tables: bucket i of the thresholds selects score i. Ladders that test
+# "value > threshold" use side='left', "value < threshold" the default 'right'.
+_TOP_RATIO_THRESHOLDS = np.array([0.6, 0.8])
+_DIVERSITY_SCORES = np.array([0.9, 0.7, 0.5])  # good diversity, over 60%, over 80% of posts in one subreddit
+_SIMILARITY_THRESHOLDS = np.array([0.1, 0.3, 0.5])
+_TOPIC_CHANGE_SCORES = np.array([0.3, 0.5, 0.7, 0.9])  # almost complete change ... natural evolution
+_PROMO_RATIO_THRESHOLDS = np.array([0.1, 0.3, 0.5])
+_PROMOTIONAL_SCORES = np.array([0.9, 0.7, 0.5, 0.3])  # little/no ... majority promotional
+
+_PROMOTIONAL_KEYWORDS = frozenset({
+    'free', 'deal', 'discount', 'promo', 'sale', 'offer',
+    'buy', 'sell', 'price', 'shop', 'store', 'marketing'
+})
+
+# Keywords match anywhere in the name ('freestuff' counts as 'free'), so one
+# alternation scans the name instead of a token lookup in the frozenset
+_PROMOTIONAL_RE = re.compile('|'.join(map(re.escape, sorted(_PROMOTIONAL_KEYWORDS))))
+
+@lru_cache(maxsize=65536)
+def _is_promotional_name(subreddit: str) -> bool:
+    """Check a subreddit name for promotional keywords, memoized since names recur across users"""
+    return _PROMOTIONAL_RE.search(subreddit) is not None
 
 class SubredditHeuristic(BaseHeuristic):
     """Analyzes subreddit distribution and topic changes"""
 
     def __init__(self):
-        self.promotional_keywords = {
-            'free', 'deal', 'discount', 'promo', 'sale', 'offer',
-            'buy', 'sell', 'price', 'shop', 'store', 'marketing'
-        }
+        self.promotional_keywords = _PROMOTIONAL_KEYWORDS
 
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         # Get subreddit history
-        subreddit_history = self._get_subreddit_history(data)
-        if not subreddit_history:
-            return {
-                'diversity_score': 0.8,
-                'topic_change_score': 0.8,
-                'promotional_score': 0.8,
-                'metrics': {
-                    'unique_subreddits': 0.0,
-                    'total_subreddits': 0.0,
-                    'promo_ratio': 0.0,
-                    'topic_similarity': 0.0
-                }
-            }
+        subreddits = self._get_subreddit_history(data)
+        if not subreddits:
+            return self._get_default_scores()
+
+        # Count each subreddit once; keyword checks only run on distinct names
+        counts = Counter(subreddits)
+        promo_subs = [sub for sub in counts if self._is_promotional(sub)]
+
+        # Compare historical and recent halves once for both topic measures
+        overlap, total_subs = self._split_overlap(subreddits)
 
         # Analyze subreddit patterns
-        diversity_score = float(self._analyze_diversity(subreddit_history))
-        topic_change_score = float(self._analyze_topic_changes(subreddit_history))
-        promotional_score = float(self._analyze_promotional_content(subreddit_history))
+        diversity_score = float(self._analyze_diversity(subreddits, counts))
+        topic_change_score = float(self._analyze_topic_changes(len(subreddits), overlap, total_subs))
+        promotional_score = float(self._analyze_promotional_content(counts, promo_subs))
 
         # Calculate metrics
-        subreddits = [h['subreddit'] for h in subreddit_history]
-        counts = Counter(subreddits)
-        promo_count = sum(1 for sub in set(subreddits) 
-                         if any(kw in sub for kw in self.promotional_keywords))
-
         metrics = {
-            'unique_subreddits': float(len(set(subreddits))),
+            'unique_subreddits': float(len(counts)),
             'total_subreddits': float(len(subreddits)),
-            'promo_ratio': float(promo_count / max(1, len(set(subreddits)))),
-            'topic_similarity': float(self._calculate_topic_similarity(subreddit_history))
+            'promo_ratio': float(len(promo_subs) / max(1, len(counts))),
+            'topic_similarity': float(self._calculate_topic_similarity(len(subreddits), overlap, total_subs))
         }
 
         return {
@@ -52,108 +68,151 @@ class SubredditHeuristic(BaseHeuristic):
             'metrics': metrics
         }
 
-    def _get_subreddit_history(self, data: Dict[str, Any]) -> List[Dict]:
-        """Compile chronological subreddit history"""
-        history = []
-
-        # Add comments
-        for comment in data.get('comments', []):
-            history.append({
-                'time': comment.get('created_utc', None),
-                'subreddit': str(comment.get('subreddit', '')).lower()
-            })
-
-        # Add submissions
-        for submission in data.get('submissions', []):
-            history.append({
-                'time': submission.get('created_utc', None),
-                'subreddit': str(submission.get('subreddit', '')).lower()
-            })
-
-        # Sort by time and filter invalid entries
-        return sorted(
-            (h for h in history if h['time'] is not None and h['subreddit']),
-            key=lambda x: x['time']
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Vectorized analyze() over many users"""
+        n = len(users)
+        histories = [self._get_subreddit_history(data) for data in users]
+        lengths = np.fromiter((len(history) for history in histories), dtype=np.int64, count=n)
+
+        # Integer code per distinct subreddit name across the whole batch
+        index: Dict[str, int] = {}
+        codes = np.fromiter((index.setdefault(sub, len(index)) for history in histories for sub in history),
+                            dtype=np.int64, count=int(lengths.sum()))
+        promotional = np.fromiter((self._is_promotional(sub) for sub in index), dtype=bool, count=len(index))
+        num_codes = max(1, len(index))
+        owners = np.repeat(np.arange(n), lengths)
+
+        # Distinct (user, subreddit) pairs with their post counts
+        pairs, pair_counts = np.unique(owners * num_codes + codes, return_counts=True)
+        pair_owners = pairs // num_codes
+        unique_subs = np.bincount(pair_owners, minlength=n)
+        top_counts = np.zeros(n, dtype=np.int64)
+        np.maximum.at(top_counts, pair_owners, pair_counts)
+        promo_unique = np.bincount(pair_owners, weights=promotional[pairs % num_codes], minlength=n)
+        promo_total = np.bincount(owners, weights=promotional[codes], minlength=n)
+
+        # A pair seen in both the historical and the recent half counts toward the overlap
+        positions = np.arange(owners.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        halves = np.unique((owners * num_codes + codes) * 2 + (positions >= (lengths // 2)[owners]))
+        in_both = (halves[1:] // 2) == (halves[:-1] // 2)
+        overlap = np.bincount(halves[1:][in_both] // 2 // num_codes, minlength=n)
+
+        totals = np.maximum(1, lengths)
+        top_ratio = top_counts / totals
+        similarity = overlap / np.maximum(1, unique_subs)
+        promo_ratio = promo_total / totals
+
+        diversity_scores = np.where(
+            lengths < 5, 0.8,  # Too few posts for meaningful analysis
+            np.where(unique_subs == 1, 0.4,
+                     _DIVERSITY_SCORES[np.searchsorted(_TOP_RATIO_THRESHOLDS, top_ratio, side='left')])
         )
+        topic_change_scores = np.where(lengths < 10, 0.8,
+                                       _TOPIC_CHANGE_SCORES[np.searchsorted(_SIMILARITY_THRESHOLDS, similarity, side='right')])
+        promotional_scores = _PROMOTIONAL_SCORES[np.searchsorted(_PROMO_RATIO_THRESHOLDS, promo_ratio, side='left')]
+        topic_similarity = np.where(lengths < 2, 1.0, similarity)
+
+        return [
+            {
+                'diversity_score': float(diversity_scores[i]),
+                'topic_change_score': float(topic_change_scores[i]),
+                'promotional_score': float(promotional_scores[i]),
+                'metrics': {
+                    'unique_subreddits': float(unique_subs[i]),
+                    'total_subreddits': float(lengths[i]),
+                    'promo_ratio': float(promo_unique[i] / max(1, unique_subs[i])),
+                    'topic_similarity': float(topic_similarity[i])
+                }
+            } if lengths[i] else self._get_default_scores()
+            for i in range(n)
+        ]
 
-    def _analyze_diversity(self, history: List[Dict]) -> float:
-        """Analyze subreddit diversity"""
-        subreddits = [h['subreddit'] for h in history]
-        unique_count = len(set(subreddits))
+    def _get_default_scores(self) -> Dict[str, Any]:
+        """Return neutral default scores"""
+        return {
+            'diversity_score': 0.8,
+            'topic_change_score': 0.8,
+            'promotional_score': 0.8,
+            'metrics': {
+                'unique_subreddits': 0.0,
+                'total_subreddits': 0.0,
+                'promo_ratio': 0.0,
+                'topic_similarity': 0.0
+            }
+        }
 
+    def _get_subreddit_history(self, data: Dict[str, Any]) -> List[str]:
+        """Compile chronological subreddit history as a list of subreddit names"""
+        comments = self.get_comments(data)
+        submissions = data.get('submissions', [])
+        if not comments and not submissions:
+            return []
+
+        # Pair epoch seconds (NaN when missing) with names; comments reuse the shared arrays
+        arrays = data.get('comment_arrays')
+        if arrays is None:
+            arrays = comment_arrays(comments)
+        history = list(zip(arrays['created_utc'].tolist(),
+                           (str(comment.subreddit).lower() for comment in comments)))
+        history.extend(
+            (to_epoch(submission.get('created_utc', None)), str(submission.get('subreddit', '')).lower())
+            for submission in submissions
+        )
+
+        # Filter invalid entries (NaN != NaN) and sort by time
+        history = [entry for entry in history if entry[0] == entry[0] and entry[1]]
+        history.sort(key=itemgetter(0))
+        return [subreddit for _, subreddit in history]
+
+    def _analyze_diversity(self, subreddits: List[str], counts: Counter) -> float:
+        """Analyze subreddit diversity"""
         if len(subreddits) < 5:  # Too few posts for meaningful analysis
             return 0.8
 
-        # Calculate concentration using Counter
-        counts = Counter(subreddits)
+        # Calculate concentration from the per-subreddit counts
+        unique_count = len(counts)
         top_ratio = float(counts.most_common(1)[0][1] / len(subreddits))
 
         if unique_count == 1:  # Only one subreddit
             return 0.4
-        elif top_ratio > 0.8:  # Over 80% posts in one subreddit
-            return 0.5
-        elif top_ratio > 0.6:  # Over 60% posts in one subreddit
-            return 0.7
-        return 0.9  # Good diversity
+        return threshold_lookup(top_ratio, _TOP_RATIO_THRESHOLDS, _DIVERSITY_SCORES, side='left')
 
-    def _analyze_topic_changes(self, history: List[Dict]) -> float:
-        """Analyze sudden changes in subreddit patterns"""
-        if len(history) < 10:  # Need more data for meaningful analysis
-            return 0.8
+    def _split_overlap(self, subreddits: List[str]) -> Tuple[int, int]:
+        """Count subreddits shared by, and present in either of, the historical and recent halves"""
+        if len(subreddits) < 2:
+            return 0, 0
 
-        # Look at recent vs historical distribution
-        midpoint = len(history) // 2
-        historical_subs = set(h['subreddit'] for h in history[:midpoint])
-        recent_subs = set(h['subreddit'] for h in history[midpoint:])
+        midpoint = len(subreddits) // 2
+        historical_subs = set(subreddits[:midpoint])
+        recent_subs = set(subreddits[midpoint:])
+        return len(historical_subs & recent_subs), len(historical_subs | recent_subs)
 
-        # Calculate overlap
-        overlap = len(historical_subs & recent_subs)
-        total_subs = len(historical_subs | recent_subs)
+    def _analyze_topic_changes(self, num_entries: int, overlap: int, total_subs: int) -> float:
+        """Analyze sudden changes in subreddit patterns"""
+        if num_entries < 10:  # Need more data for meaningful analysis
+            return 0.8
 
         if total_subs == 0:
             return 0.8
 
         similarity = float(overlap / total_subs)
+        return threshold_lookup(similarity, _SIMILARITY_THRESHOLDS, _TOPIC_CHANGE_SCORES)
 
-        if similarity < 0.1:  # Almost complete change
-            return 0.3
-        elif similarity < 0.3:  # Major change
-            return 0.5
-        elif similarity < 0.5:  # Moderate change
-            return 0.7
-        return 0.9  # Natural evolution
+    def _is_promotional(self, subreddit: str) -> bool:
+        """Check whether a subreddit name contains a promotional keyword"""
+        return _is_promotional_name(subreddit)
 
-    def _analyze_promotional_content(self, history: List[Dict]) -> float:
+    def _analyze_promotional_content(self, counts: Counter, promo_subs: List[str]) -> float:
         """Analyze presence in promotional subreddits"""
-        subreddits = [h['subreddit'] for h in history]
-        promo_count = sum(
-            1 for sub in subreddits 
-            if any(kw in sub for kw in self.promotional_keywords)
-        )
+        promo_count = sum(counts[sub] for sub in promo_subs)
 
-        promo_ratio = float(promo_count / max(1, len(subreddits)))
+        promo_ratio = float(promo_count / max(1, sum(counts.values())))
+        return threshold_lookup(promo_ratio, _PROMO_RATIO_THRESHOLDS, _PROMOTIONAL_SCORES, side='left')
 
-        if promo_ratio > 0.5:  # Majority promotional
-            return 0.3
-        elif promo_ratio > 0.3:  # High promotional
-            return 0.5
-        elif promo_ratio > 0.1:  # Some promotional
-            return 0.7
-        return 0.9  # Little/no promotional
-
-    def _calculate_topic_similarity(self, history: List[Dict]) -> float:
+    def _calculate_topic_similarity(self, num_entries: int, overlap: int, total_subs: int) -> float:
         """Calculate similarity between historical and recent subreddits"""
-        if len(history) < 2:
+        # Both halves are non-empty once there are two entries
+        if num_entries < 2:
             return 1.0
 
-        midpoint = len(history) // 2
-        historical = set(h['subreddit'] for h in history[:midpoint])
-        recent = set(h['subreddit'] for h in history[midpoint:])
-
-        if not historical or not recent:
-            return 1.0
-
-        intersection = len(historical & recent)
-        union = len(historical | recent)
-
-        return float(intersection / max(1, union))
\ No newline at end of file
+        return float(overlap / max(1, total_subs))
\ No newline at end of file
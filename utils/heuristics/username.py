@@ -1,35 +1,93 @@
+import math
 import re
-from typing import Dict, Any
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List, Pattern, Sequence, Tuple
+import numpy as np
 from .base import BaseHeuristic
 
+_LN2 = math.log(2.0)
+
+_SUSPICIOUS_PATTERNS = (
+    r'\d{4,}',  # 4+ consecutive numbers
+    r'bot\d*',  # Contains 'bot'
+    r'[A-Z][a-z]+\d{2,}',  # CamelCase followed by numbers
+    r'[a-zA-Z]\d{3,}[a-zA-Z]',  # Letters with 3+ numbers
+    r'(best|top|cheap|deal|price|buy|sell)\w*',  # Commercial terms
+    r'\w+_\w+_\d{2,}',  # Words_With_Numbers
+    r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}',  # Email patterns
+    r'\d{3}[-.]?\d{3}[-.]?\d{4}'  # Phone number patterns
+)
+
+@lru_cache(maxsize=8)
+def _compile_patterns(patterns: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, Pattern], ...], Pattern]:
+    """Compile a pattern set once: the individual matchers plus their alternation
+
+    The alternation finds names matching none of the patterns in a single search;
+    the individual matchers report which ones hit (overlapping hits such as
+    'bot1234' would be lost by the alternation alone).
+    """
+    compiled = tuple((pattern, re.compile(pattern)) for pattern in patterns)
+    any_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)) if patterns else None
+    return compiled, any_pattern
+
+def _shannon_entropy(text: str) -> float:
+    """Shannon entropy of a string in bits, from one pass of character counts"""
+    length = len(text)
+    if length <= 1:
+        return 0.0
+    return -sum(p * math.log(p) / _LN2 for p in (count / length for count in Counter(text).values()))
+
+def _batch_entropy(usernames: Sequence[str]) -> np.ndarray:
+    """Shannon entropy of many strings at once from a single count of (string, character) pairs"""
+    n = len(usernames)
+    lengths = np.fromiter((len(name) for name in usernames), dtype=np.int64, count=n)
+    codes = np.frombuffer(''.join(usernames).encode('utf-32-le'), dtype=np.uint32)
+    owners = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+    # Pack owner and code point into one int64 key so np.unique counts each pair
+    pairs, counts = np.unique((owners << 32) | codes, return_counts=True)
+    pair_owners = pairs >> 32
+    p = counts / lengths[pair_owners]
+    entropies = -np.bincount(pair_owners, weights=p * np.log(p) / _LN2, minlength=n)
+    entropies[lengths <= 1] = 0.0
+    return entropies
+
 class UsernameHeuristic(BaseHeuristic):
     """Analyzes username patterns for bot-like characteristics"""
     
     def __init__(self):
-        self.suspicious_patterns = [
-            r'\d{4,}',  # 4+ consecutive numbers
-            r'bot\d*',  # Contains 'bot'
-            r'[A-Z][a-z]+\d{2,}',  # CamelCase followed by numbers
-            r'[a-zA-Z]\d{3,}[a-zA-Z]',  # Letters with 3+ numbers
-            r'(best|top|cheap|deal|price|buy|sell)\w*',  # Commercial terms
-            r'\w+_\w+_\d{2,}',  # Words_With_Numbers
-            r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}',  # Email patterns
-            r'\d{3}[-.]?\d{3}[-.]?\d{4}'  # Phone number patterns
-        ]
+        self.suspicious_patterns = list(_SUSPICIOUS_PATTERNS)
     
     def analyze(self, data: Dict[str, Any]) -> Dict[str, float]:
         username = data['username'].lower()
+        return self._score_username(username, self._calculate_entropy(username))
+
+    def analyze_batch(self, users: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score many usernames, computing all their entropies in one vectorized pass"""
+        usernames = [data.get('username') for data in users]
+        if not all(isinstance(name, str) for name in usernames):
+            # Fall back to the per-user path, which raises for missing usernames as before
+            return super().analyze_batch(users)
+
+        lowered = [name.lower() for name in usernames]
+        entropies = _batch_entropy(lowered)
+        return [self._score_username(name, float(entropy)) for name, entropy in zip(lowered, entropies)]
+
+    def _score_username(self, username: str, entropy_score: float) -> Dict[str, Any]:
+        """Score a lowercased username given its entropy"""
         username_score = 1.0
         
-        # Check for suspicious patterns
+        # Check for suspicious patterns, compiled once per distinct pattern set
+        compiled_patterns, any_pattern = _compile_patterns(tuple(self.suspicious_patterns))
         pattern_matches = []
-        for pattern in self.suspicious_patterns:
-            if re.search(pattern, username):
-                username_score *= 0.8  # Reduce score for each suspicious pattern
-                pattern_matches.append(pattern)
+        if any_pattern is not None and any_pattern.search(username):
+            for pattern, compiled in compiled_patterns:
+                if compiled.search(username):
+                    username_score *= 0.8  # Reduce score for each suspicious pattern
+                    pattern_matches.append(pattern)
         
         # Check username entropy (randomness)
-        entropy_score = self._calculate_entropy(username)
         if entropy_score > 4.5:  # Very random username
             username_score *= 0.9
             
@@ -48,7 +106,4 @@ class UsernameHeuristic(BaseHeuristic):
     
     def _calculate_entropy(self, username: str) -> float:
         """Calculate Shannon entropy of username"""
-        import math
-        prob = [float(username.count(c)) / len(username) for c in dict.fromkeys(list(username))]
-        entropy = - sum(p * math.log(p) / math.log(2.0) for p in prob)
-        return entropy
+        return _shannon_entropy(username)
@@ -1,6 +1,6 @@
 import gettext
 import os
-from typing import Optional
+from typing import Callable, Optional
 from functools import lru_cache
 import streamlit as st
 from pathlib import Path
@@ -15,29 +15,30 @@ SUPPORTED_LANGUAGES = {
     'zh': '中文',
 }
 
-class I18n:
-    def __init__(self):
-        self._translations = {}
-        self._load_translations()
+@lru_cache(maxsize=None)
+def _get_translator(lang_code: str) -> Callable[[str], str]:
+    """Load the translation catalog for a language once per process"""
+    try:
+        translator = gettext.translation(
+            'messages',
+            localedir=str(TRANSLATIONS_DIR),
+            languages=[lang_code],
+            fallback=True
+        )
+        return translator.gettext
+    except Exception as e:
+        print(f"Failed to load translation for {lang_code}: {e}")
+        # Fallback to simple pass-through translation
+        return lambda x: x
+
+@lru_cache(maxsize=4096)
+def _translate_cached(lang_code: str, text: str) -> str:
+    """Translate text, reusing results for repeated UI strings"""
+    return _get_translator(lang_code)(text)
 
-    def _load_translations(self):
-        """Load all available translations"""
-        if not TRANSLATIONS_DIR.exists():
-            TRANSLATIONS_DIR.mkdir(parents=True)
-            
-        for lang_code in SUPPORTED_LANGUAGES:
-            try:
-                translator = gettext.translation(
-                    'messages',
-                    localedir=str(TRANSLATIONS_DIR),
-                    languages=[lang_code],
-                    fallback=True
-                )
-                self._translations[lang_code] = translator.gettext
-            except Exception as e:
-                print(f"Failed to load translation for {lang_code}: {e}")
-                # Fallback to simple pass-through translation
-                self._translations[lang_code] = lambda x: x
+class I18n:
+    # Translators are cached at module level, so instances carry no state
+    __slots__ = ()
 
     def get_language_from_browser(self) -> str:
         """Get the preferred language from browser settings"""
@@ -55,8 +56,9 @@ class I18n:
     def translate(self, text: str) -> str:
         """Translate text to current language"""
         current_lang = self.get_language_from_browser()
-        translator = self._translations.get(current_lang, lambda x: x)
-        return translator(text)
+        if current_lang not in SUPPORTED_LANGUAGES:
+            return text
+        return _translate_cached(current_lang, text)
 
 # Create global instance
 i18n = I18n()
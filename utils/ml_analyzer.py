@@ -1,41 +1,109 @@
 """Machine Learning Analyzer for Reddit user behavior."""
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from numbers import Real
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import logging
-from typing import Dict, List, Tuple, Union
-from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from utils.performance_monitor import timing_decorator, performance_monitor
 
 logger = logging.getLogger(__name__)
 
+# Names of the features built by MLAnalyzer.extract_features, in column order
+FEATURE_NAMES = (
+    'account_age', 'comment_karma', 'link_karma', 'karma_ratio',
+    'subreddit_diversity', 'avg_score', 'activity_hours', 'active_subreddits',
+    'vocab_size', 'word_length', 'comment_similarity', 'vocab_diversity'
+)
+NUM_FEATURES = len(FEATURE_NAMES)
+
+# Initial number of rows preallocated for training examples (doubled when full)
+_TRAINING_CAPACITY = 16
+
+# Fewest examples the model is trained on; later refits happen each time the
+# example count doubles, so N examples cost O(log N) refits instead of O(N)
+_MIN_TRAINING_EXAMPLES = 5
+
+# Training sets at least this large build their trees on all cores; smaller fits
+# are dominated by per-tree dispatch and stay single-threaded
+_PARALLEL_FIT_MIN_EXAMPLES = 500
+
+# Shared default for missing collection metrics so lookups never allocate
+_EMPTY = ()
+
+# A fitted binary forest flattened into shared node arrays. Tree t starts at
+# node roots[t]; leaves loop onto themselves and value holds P(class 1).
+_PackedForest = namedtuple('_PackedForest', 'roots feature threshold left right value depth')
+
+def _pack_forest(forest: RandomForestClassifier) -> Optional[_PackedForest]:
+    """Flatten a fitted forest's trees for lockstep traversal (None unless single-output binary)."""
+    if forest.n_outputs_ != 1 or forest.n_classes_ != 2:
+        return None
+
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    roots = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    feature = np.concatenate([tree.feature for tree in trees])
+    threshold = np.concatenate([tree.threshold for tree in trees])
+    left = np.concatenate([tree.children_left + root for tree, root in zip(trees, roots)])
+    right = np.concatenate([tree.children_right + root for tree, root in zip(trees, roots)])
+    value = np.concatenate([tree.value[:, 0, 1] for tree in trees])
+
+    # Leaves point back to themselves so every tree can take the same number of steps
+    leaves = np.flatnonzero(np.concatenate([tree.children_left for tree in trees]) < 0)
+    left[leaves] = right[leaves] = leaves
+    feature[leaves] = 0
+    return _PackedForest(roots, feature, threshold, left, right, value, max(tree.max_depth for tree in trees))
+
+def _forest_risk(packed: _PackedForest, features: np.ndarray) -> np.ndarray:
+    """P(class 1) per row, equal to RandomForestClassifier.predict_proba(features)[:, 1]."""
+    # Trees compare float32 features against float64 thresholds
+    X = features.astype(np.float32)
+    rows = np.arange(X.shape[0])[:, None]
+    nodes = np.broadcast_to(packed.roots, (X.shape[0], packed.roots.size))
+    for _ in range(packed.depth):
+        go_left = X[rows, packed.feature[nodes]] <= packed.threshold[nodes]
+        nodes = np.where(go_left, packed.left[nodes], packed.right[nodes])
+    # cumsum adds tree by tree in the forest's order (sum() may pair terms differently)
+    return np.cumsum(packed.value[nodes], axis=1)[:, -1] / packed.roots.size
+
+def _basic_rules_risk(account_age_days: float, total_karma: float, unique_subreddits: float,
+                      vocab_size: float, thresholds: Tuple[float, float, float, float]) -> float:
+    """Risk from how many basic rule minimums (age, karma, subreddits, vocabulary) the account falls below."""
+    # Start with a moderate-low base risk and add a share for each failed check
+    base_risk = 0.3
+    total_factors = 4
+    risk_factors = ((account_age_days < thresholds[0]) + (total_karma < thresholds[1])
+                    + (unique_subreddits < thresholds[2]) + (vocab_size < thresholds[3]))
+    return float(base_risk + (0.7 * risk_factors / total_factors))
+
 class MLAnalyzer:
-    """Singleton ML Analyzer with improved lazy loading."""
-    _instance = None
-    _initialized = False
+    """ML Analyzer with lazy model loading; share the module-level ml_analyzer instance."""
     _model = None
     _scaler = None
     _is_trained = False
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(MLAnalyzer, cls).__new__(cls)
-        return cls._instance
+    # Fitted scaler statistics, cached so scaling skips sklearn's input validation
+    _feature_mean = None
+    _feature_scale = None
+    # Trained forest flattened for fast inference (see _pack_forest)
+    _packed_forest = None
 
     @timing_decorator("ml_analyzer_init")
     def __init__(self):
         """Initialize only essential components."""
-        if not self._initialized:
-            performance_monitor.start_operation("ml_init")
-            try:
-                # Initialize training data storage
-                self.training_features = []
-                self.training_labels = []
-                self._setup_basic_rules()
-                self._initialized = True
-                logger.info("MLAnalyzer base initialization complete")
-            finally:
-                performance_monitor.end_operation("ml_init")
+        performance_monitor.start_operation("ml_init")
+        try:
+            # Initialize training data storage: contiguous arrays grown by doubling
+            self._training_X = np.empty((_TRAINING_CAPACITY, NUM_FEATURES), dtype=np.float64)
+            self._training_y = np.empty(_TRAINING_CAPACITY, dtype=np.int8)
+            self._num_examples = 0
+            self._next_fit_at = _MIN_TRAINING_EXAMPLES
+            self._setup_basic_rules()
+            logger.info("MLAnalyzer base initialization complete")
+        finally:
+            performance_monitor.end_operation("ml_init")
 
     @property
     def model(self):
@@ -61,6 +129,16 @@ class MLAnalyzer:
             self._scaler = StandardScaler()
         return self._scaler
 
+    @property
+    def training_features(self) -> np.ndarray:
+        """View of the collected training feature rows."""
+        return self._training_X[:self._num_examples]
+
+    @property
+    def training_labels(self) -> np.ndarray:
+        """View of the collected training labels (0 legitimate, 1 suspicious)."""
+        return self._training_y[:self._num_examples]
+
     @property
     def is_trained(self):
         """Check if model is trained."""
@@ -74,17 +152,23 @@ class MLAnalyzer:
     def _train_model(self) -> bool:
         """Train the model with collected examples."""
         try:
-            if len(self.training_features) < 5:
+            if self._num_examples < _MIN_TRAINING_EXAMPLES:
                 logger.warning("Not enough training examples to train model")
                 return False
 
-            # Convert lists to numpy arrays
-            X = np.array(self.training_features)
-            y = np.array(self.training_labels)
+            # Views of the collected examples, no conversion needed
+            X = self.training_features
+            y = self.training_labels
 
             # Scale features and train model
             X_scaled = self.scaler.fit_transform(X)
+            self._feature_mean = self.scaler.mean_
+            self._feature_scale = self.scaler.scale_
+            self._packed_forest = None
+            # Per-tree seeds are drawn up front, so the fitted forest does not depend on n_jobs
+            self.model.set_params(n_jobs=-1 if self._num_examples >= _PARALLEL_FIT_MIN_EXAMPLES else None)
             self.model.fit(X_scaled, y)
+            self._packed_forest = _pack_forest(self.model)
             self.is_trained = True
 
             logger.info("Model successfully trained")
@@ -94,58 +178,109 @@ class MLAnalyzer:
             return False
 
     @timing_decorator("feature_extraction")
-    def extract_features(self, user_data: Dict, activity_patterns: Dict, text_metrics: Dict) -> np.ndarray:
-        """Extract and normalize features from user data."""
+    def extract_features(self, user_data: Dict, activity_patterns: Dict, text_metrics: Dict,
+                         now_ts: Optional[float] = None) -> np.ndarray:
+        """Extract and normalize features from user data (now_ts: current epoch seconds, if known)."""
+        # Fill a preallocated row in place instead of building and converting a list
+        features_array = np.empty((1, NUM_FEATURES), dtype=np.float64)
+        self._fill_features(features_array[0], user_data, activity_patterns, text_metrics, now_ts)
+        return features_array
+
+    def _fill_features(self, row: np.ndarray, user_data: Dict, activity_patterns: Dict,
+                       text_metrics: Dict, now_ts: Optional[float] = None) -> bool:
+        """Write the normalized feature vector into row; returns False if the input is malformed.
+
+        A malformed row is filled with zeros, which for a trained model is the scaled
+        training mean, i.e. a neutral account rather than one with zero age and karma.
+        """
         try:
-            # Calculate derived features
-            account_age_days = float((datetime.now(timezone.utc) - user_data['created_utc']).days)
-            karma_ratio = float(user_data['comment_karma']) / float(max(1, user_data['link_karma']))
-
-            features = [
-                float(account_age_days),  # account age in days
-                float(user_data['comment_karma']),
-                float(user_data['link_karma']),
-                float(karma_ratio),  # ratio of comment to link karma
-
-                float(activity_patterns['unique_subreddits']),
-                float(activity_patterns.get('avg_score', 0)),
-                float(len(activity_patterns.get('activity_hours', {}))),  # activity hours diversity
-                float(len(activity_patterns.get('top_subreddits', {}))),  # number of active subreddits
-
-                float(text_metrics.get('vocab_size', 0)),
-                float(text_metrics.get('avg_word_length', 0)),
-                float(text_metrics.get('avg_similarity', 0)),
-                float(len(text_metrics.get('common_words', {})))  # vocabulary diversity
-            ]
-
-            # Reshape and scale features
-            features_array = np.array(features, dtype=np.float64).reshape(1, -1)
-            if self.is_trained:
-                features_array = self.scaler.transform(features_array)
-
-            return features_array
-
+            self._extract_features_into(row, user_data, activity_patterns, text_metrics, now_ts)
         except Exception as e:
             logger.error(f"Error extracting features: {str(e)}")
-            return np.zeros((1, 12), dtype=np.float64)  # Return zero features array
+            row.fill(0.0)  # Scaled mean features row
+            return False
+
+        # Scale features
+        if self.is_trained:
+            self._scale_features(row)
+        return True
+
+    def _scale_features(self, features: np.ndarray) -> np.ndarray:
+        """Standardize feature rows in place, as scaler.transform does."""
+        np.subtract(features, self._feature_mean, out=features)
+        np.divide(features, self._feature_scale, out=features)
+        return features
+
+    def _extract_features_into(self, row: np.ndarray, user_data: Dict, activity_patterns: Dict,
+                               text_metrics: Dict, now_ts: Optional[float] = None) -> None:
+        """Write the unscaled feature vector into a preallocated row."""
+        # Calculate derived features
+        account_age_days = self._account_age_days(user_data, now_ts)
+        karma_ratio = float(user_data['comment_karma']) / float(max(1, user_data['link_karma']))
+
+        row[0] = account_age_days  # account age in days
+        row[1] = float(user_data['comment_karma'])
+        row[2] = float(user_data['link_karma'])
+        row[3] = karma_ratio  # ratio of comment to link karma
+
+        activity = activity_patterns.get
+        row[4] = float(activity_patterns['unique_subreddits'])
+        row[5] = float(activity('avg_score', 0))
+        row[6] = float(len(activity('activity_hours', _EMPTY)))  # activity hours diversity
+        row[7] = float(len(activity('top_subreddits', _EMPTY)))  # number of active subreddits
+
+        text = text_metrics.get
+        row[8] = float(text('vocab_size', 0))
+        row[9] = float(text('avg_word_length', 0))
+        row[10] = float(text('avg_similarity', 0))
+        row[11] = float(len(text('common_words', _EMPTY)))  # vocabulary diversity
 
     @timing_decorator("risk_prediction")
     def predict_risk_score(self, features: np.ndarray, user_data: Dict, 
-                          activity_patterns: Dict, text_metrics: Dict) -> float:
+                          activity_patterns: Dict, text_metrics: Dict, now_ts: Optional[float] = None) -> float:
         """Predict risk score for given features."""
         try:
             if not self.is_trained:
                 logger.warning("Model not trained yet, using basic rules for prediction")
-                return self._apply_basic_rules(features, user_data, activity_patterns, text_metrics)
+                return self._apply_basic_rules(features, user_data, activity_patterns, text_metrics, now_ts)
 
             # Get probability of being suspicious (class 1)
-            probabilities = self.model.predict_proba(features)
-            return float(probabilities[0][1])  # Return probability of being suspicious
+            return float(self.predict_risk_scores(features)[0])
 
         except Exception as e:
             logger.error(f"Error predicting risk score: {str(e)}")
             return 0.3  # Return lower default risk score
 
+    def _account_age_days(self, user_data: Dict, now_ts: Optional[float] = None) -> float:
+        """Whole days since the account was created, using epoch seconds instead of datetime arithmetic.
+
+        created_utc may be an epoch timestamp (as Reddit's API returns it) or a datetime; naive
+        datetimes are taken to be in UTC.
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        created = user_data['created_utc']
+        if isinstance(created, Real) and not isinstance(created, bool):
+            created_ts = created
+        elif isinstance(created, datetime):
+            if created.tzinfo is None:
+                # timestamp() would otherwise read a naive datetime as local time
+                created = created.replace(tzinfo=timezone.utc)
+            created_ts = created.timestamp()
+        else:
+            raise TypeError("created_utc must be a datetime or an epoch timestamp")
+        return float((now_ts - created_ts) // 86400)
+
+    @timing_decorator("risk_prediction_batch")
+    def predict_risk_scores(self, features: np.ndarray) -> np.ndarray:
+        """Predict risk scores for a matrix of scaled feature rows with a single model call."""
+        # The packed forest skips sklearn's per-tree dispatch; non-finite input takes the
+        # model path so it is validated (and rejected) exactly as before
+        if self._packed_forest is not None and np.isfinite(features.astype(np.float32)).all():
+            return _forest_risk(self._packed_forest, features)
+        # Probability of being suspicious (class 1) for every row
+        return self.model.predict_proba(features)[:, 1]
+
     def _setup_basic_rules(self):
         """Set up basic rules for risk assessment when model is untrained."""
         self.basic_thresholds = {
@@ -154,37 +289,22 @@ class MLAnalyzer:
             'min_subreddits': 3,  # Minimum number of unique subreddits
             'min_vocab_size': 200,  # Minimum vocabulary size
         }
+        # Thresholds as floats in _basic_rules_risk order, converted once
+        self._basic_threshold_values = tuple(float(self.basic_thresholds[key]) for key in (
+            'min_account_age_days', 'min_karma', 'min_subreddits', 'min_vocab_size'
+        ))
 
     def _apply_basic_rules(self, features: np.ndarray, user_data: Dict, 
-                          activity_patterns: Dict, text_metrics: Dict) -> float:
+                          activity_patterns: Dict, text_metrics: Dict, now_ts: Optional[float] = None) -> float:
         """Apply basic rules to determine risk when model is untrained."""
         try:
-            # Start with a moderate-low base risk
-            base_risk = 0.3
-            risk_factors = 0
-            total_factors = 4
-
-            # Account age check
-            account_age_days = float((datetime.now(timezone.utc) - user_data['created_utc']).days)
-            if account_age_days < float(self.basic_thresholds['min_account_age_days']):
-                risk_factors += 1
-
-            # Karma check
-            total_karma = float(user_data['comment_karma']) + float(user_data['link_karma'])
-            if total_karma < float(self.basic_thresholds['min_karma']):
-                risk_factors += 1
-
-            # Subreddit diversity check
-            if float(activity_patterns['unique_subreddits']) < float(self.basic_thresholds['min_subreddits']):
-                risk_factors += 1
-
-            # Vocabulary check
-            if float(text_metrics.get('vocab_size', 0)) < float(self.basic_thresholds['min_vocab_size']):
-                risk_factors += 1
-
-            # Calculate final risk score
-            risk_score = float(base_risk + (0.7 * risk_factors / total_factors))
-            return risk_score
+            return _basic_rules_risk(
+                self._account_age_days(user_data, now_ts),
+                float(user_data['comment_karma']) + float(user_data['link_karma']),
+                float(activity_patterns['unique_subreddits']),
+                float(text_metrics.get('vocab_size', 0)),
+                self._basic_threshold_values
+            )
         except Exception as e:
             logger.error(f"Error applying basic rules: {str(e)}")
             return 0.3  # Return base risk on error
@@ -193,39 +313,117 @@ class MLAnalyzer:
                            text_metrics: Dict, is_legitimate: bool = True) -> bool:
         """Add a new training example to improve the model."""
         try:
-            features = self.extract_features(user_data, activity_patterns, text_metrics)
-            self.training_features.append(features[0])  # Remove the batch dimension
-            self.training_labels.append(0 if is_legitimate else 1)  # 0 for legitimate, 1 for suspicious
+            if self._num_examples == len(self._training_y):
+                self._grow_training_storage()
+            # Write the features straight into the next storage row instead of copying a 1-row array;
+            # malformed examples are dropped rather than stored as a zero row
+            if not self._fill_features(self._training_X[self._num_examples], user_data, activity_patterns, text_metrics):
+                return False
+            self._training_y[self._num_examples] = 0 if is_legitimate else 1  # 0 for legitimate, 1 for suspicious
+            self._num_examples += 1
 
-            # Retrain model if we have enough examples
-            if len(self.training_labels) >= 5:  # Minimum examples before training
-                self._train_model()
+            # Retrain once enough examples arrived, then again whenever the count doubles
+            if self._num_examples >= self._next_fit_at and self._train_model():
+                self._next_fit_at = 2 * self._num_examples
 
-            logger.info(f"Added new training example. Total examples: {len(self.training_labels)}")
+            logger.info(f"Added new training example. Total examples: {self._num_examples}")
             return True
         except Exception as e:
             logger.error(f"Error adding training example: {str(e)}")
             return False
 
+    def add_training_examples_bulk(self, examples: Sequence[Tuple[Dict, Dict, Dict]],
+                                   is_legitimate: Sequence[bool]) -> bool:
+        """Add many (user_data, activity_patterns, text_metrics) examples and retrain at most once."""
+        try:
+            if len(examples) != len(is_legitimate):
+                raise ValueError("examples and is_legitimate must have the same length")
+
+            start = self._num_examples
+            end = start + len(examples)
+            if end > len(self._training_y):
+                self._grow_training_storage(end)
+
+            now_ts = time.time()
+            rows = self._training_X[start:end]
+            extracted = np.fromiter(
+                (self._fill_features(row, user_data, activity_patterns, text_metrics, now_ts)
+                 for row, (user_data, activity_patterns, text_metrics) in zip(rows, examples)),
+                dtype=bool, count=len(examples)
+            )
+            # Malformed examples are dropped rather than stored as zero rows
+            end = start + int(extracted.sum())
+            self._training_X[start:end] = rows[extracted]
+            self._training_y[start:end] = np.logical_not(is_legitimate)[extracted]  # 0 for legitimate, 1 for suspicious
+            self._num_examples = end
+
+            if self._num_examples >= self._next_fit_at and self._train_model():
+                self._next_fit_at = 2 * self._num_examples
+
+            logger.info(f"Added {len(examples)} training examples. Total examples: {self._num_examples}")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding training examples: {str(e)}")
+            return False
+
+    def _grow_training_storage(self, min_capacity: int = 0) -> None:
+        """Double the capacity of the training arrays (at least to min_capacity), keeping the collected examples."""
+        capacity = max(2 * len(self._training_y), min_capacity)
+        training_X = np.empty((capacity, NUM_FEATURES), dtype=np.float64)
+        training_y = np.empty(capacity, dtype=np.int8)
+        training_X[:self._num_examples] = self.training_features
+        training_y[:self._num_examples] = self.training_labels
+        self._training_X, self._training_y = training_X, training_y
+
     def analyze_account(self, user_data: Dict, activity_patterns: Dict, text_metrics: Dict) -> Tuple[float, Dict[str, float]]:
         """Analyze account using ML model and return risk score with feature importances."""
         try:
-            features = self.extract_features(user_data, activity_patterns, text_metrics)
-            risk_score = float(self.predict_risk_score(features, user_data, activity_patterns, text_metrics))
+            # Read the clock once for both feature extraction and the basic rules
+            now_ts = time.time()
+            features = self.extract_features(user_data, activity_patterns, text_metrics, now_ts)
+            risk_score = float(self.predict_risk_score(features, user_data, activity_patterns, text_metrics, now_ts))
 
             # Get feature importance if model is trained
-            feature_importance = {}
-            if self.is_trained:
-                importance = self.model.feature_importances_
-                feature_names = [
-                    'account_age', 'comment_karma', 'link_karma', 'karma_ratio',
-                    'subreddit_diversity', 'avg_score', 'activity_hours', 'active_subreddits',
-                    'vocab_size', 'word_length', 'comment_similarity', 'vocab_diversity'
-                ]
-                feature_importance = {name: float(imp) for name, imp in zip(feature_names, importance)}
+            feature_importance = self._feature_importance() if self.is_trained else {}
 
             return risk_score, feature_importance
 
         except Exception as e:
             logger.error(f"Error in analyze_account: {str(e)}")
-            return 0.3, {}  # Return safe defaults
\ No newline at end of file
+            return 0.3, {}  # Return safe defaults
+
+    def analyze_accounts(self, accounts: Sequence[Tuple[Dict, Dict, Dict]]) -> List[Tuple[float, Dict[str, float]]]:
+        """Analyze many (user_data, activity_patterns, text_metrics) accounts with one model call."""
+        if not self.is_trained:
+            # The basic rules are evaluated per account
+            return [self.analyze_account(*account) for account in accounts]
+
+        try:
+            now_ts = time.time()
+            features = np.empty((len(accounts), NUM_FEATURES), dtype=np.float64)
+            extracted = np.zeros(len(accounts), dtype=bool)
+            for i, (user_data, activity_patterns, text_metrics) in enumerate(accounts):
+                try:
+                    self._extract_features_into(features[i], user_data, activity_patterns, text_metrics, now_ts)
+                    extracted[i] = True
+                except Exception as e:
+                    logger.error(f"Error extracting features: {str(e)}")
+
+            if extracted.any():
+                features[extracted] = self._scale_features(features[extracted])
+            # Like extract_features, a failed row gets the training mean (zeros once scaled)
+            features[~extracted] = 0.0
+            risk_scores = self.predict_risk_scores(features)
+            feature_importance = self._feature_importance()
+            return [(float(risk), dict(feature_importance)) for risk in risk_scores]
+
+        except Exception as e:
+            logger.error(f"Error in analyze_accounts: {str(e)}")
+            return [self.analyze_account(*account) for account in accounts]
+
+    def _feature_importance(self) -> Dict[str, float]:
+        """Map feature names to the trained model's importances."""
+        return {name: float(imp) for name, imp in zip(FEATURE_NAMES, self.model.feature_importances_)}
+
+# Shared instance: import it with `from utils.ml_analyzer import ml_analyzer`
+ml_analyzer = MLAnalyzer()
@@ -1,97 +1,146 @@
+import os
+import threading
 import time
 import logging
 import functools
-from typing import Optional, Callable, Any
+from array import array
+from typing import Optional, Callable, Any, Dict, List
 from datetime import datetime
 
-# Configure logging
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+
+# Set ML_PERF=0 to turn timing_decorator into a no-op so hot paths skip the wrapper entirely
+TIMING_ENABLED = os.environ.get('ML_PERF', '1') != '0'
+
+class MetricSeries:
+    """Samples of one metric kept as parallel ring buffers of values and Unix timestamps"""
+    __slots__ = ('values', 'timestamps', '_oldest')
+
+    # Samples kept per metric; once full, each new sample overwrites the oldest
+    max_samples = 4096
+
+    def __init__(self):
+        self.values = array('d')
+        self.timestamps = array('d')
+        self._oldest = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: float, timestamp: float):
+        if len(self.values) < self.max_samples:
+            self.values.append(value)
+            self.timestamps.append(timestamp)
+        else:
+            self.values[self._oldest] = value
+            self.timestamps[self._oldest] = timestamp
+            self._oldest = (self._oldest + 1) % self.max_samples
+
+    def latest(self) -> float:
+        """Most recently recorded value"""
+        return self.values[self._oldest - 1]
+
+    def as_records(self) -> List[Dict[str, Any]]:
+        """Build the {'value', 'timestamp'} dicts on demand, oldest first"""
+        start = self._oldest
+        values = self.values[start:] + self.values[:start]
+        timestamps = self.timestamps[start:] + self.timestamps[:start]
+        return [
+            {'value': value, 'timestamp': datetime.fromtimestamp(timestamp)}
+            for value, timestamp in zip(values, timestamps)
+        ]
 
 class PerformanceMonitor:
     _instance = None
     _metrics = {}
-    _start_times = {}  # Track operation start times
-    _active_operations = set()  # Prevent duplicate measurements
+    _lock = threading.Lock()  # Guards _metrics; clocks are read outside it
+    _local = threading.local()  # Per-thread in-flight operations, so threads never skip each other's timing
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(PerformanceMonitor, cls).__new__(cls)
         return cls._instance
 
+    @classmethod
+    def active_operations(cls) -> Dict[str, int]:
+        """This thread's in-flight operations mapped to their start times (monotonic nanoseconds)"""
+        try:
+            return cls._local.operations
+        except AttributeError:
+            operations = cls._local.operations = {}
+            return operations
+
     @classmethod
     def start_operation(cls, name: str):
         """Mark the start of a performance-tracked operation"""
-        if name not in cls._active_operations:
-            cls._start_times[name] = time.time()
-            cls._active_operations.add(name)
-            logger.info(f"⏱️ Starting operation: {name}")
+        operations = cls.active_operations()
+        if name not in operations:
+            operations[name] = time.monotonic_ns()
+            logger.info("⏱️ Starting operation: %s", name)
 
     @classmethod
     def end_operation(cls, name: str):
         """Mark the end of a performance-tracked operation"""
-        if name in cls._active_operations:
-            if name in cls._start_times:
-                duration = time.time() - cls._start_times[name]
-                cls.record_metric(name, duration)
-            cls._active_operations.remove(name)
-            cls._start_times.pop(name, None)
+        operations = cls.active_operations()
+        if name in operations:
+            duration = (time.monotonic_ns() - operations[name]) / 1e9
+            cls.record_metric(name, duration)
+            del operations[name]
 
     @classmethod
     def record_metric(cls, name: str, value: float, timestamp: Optional[datetime] = None):
         """Record a performance metric"""
-        if timestamp is None:
-            timestamp = datetime.now()
-
-        if name not in cls._metrics:
-            cls._metrics[name] = []
-
-        cls._metrics[name].append({
-            'value': value,
-            'timestamp': timestamp
-        })
+        timestamp = time.time() if timestamp is None else timestamp.timestamp()
+        with cls._lock:
+            series = cls._metrics.get(name)
+            if series is None:
+                series = cls._metrics[name] = MetricSeries()
+            series.append(value, timestamp)
 
-        # Only log if this is a new measurement, not a duplicate
-        if name not in cls._active_operations:
-            logger.info(f"⏱️ Performance metric - {name}: {value:.4f}s")
+        # Only log if this is a new measurement, not a duplicate; skip formatting when INFO is off
+        if logger.isEnabledFor(logging.INFO) and name not in cls.active_operations():
+            logger.info("⏱️ Performance metric - %s: %.4fs", name, value)
 
     @classmethod
     def get_metrics(cls, name: Optional[str] = None):
-        """Retrieve recorded metrics"""
-        if name:
-            return cls._metrics.get(name, [])
-        return cls._metrics
+        """Retrieve snapshots of recorded metrics as lists of {'value', 'timestamp'} dicts, oldest first"""
+        with cls._lock:
+            if name:
+                series = cls._metrics.get(name)
+                return series.as_records() if series is not None else []
+            return {metric: series.as_records() for metric, series in cls._metrics.items()}
 
     @classmethod
     def get_latest_metrics(cls):
         """Get the most recent metrics for each category"""
-        latest = {}
-        for name, measurements in cls._metrics.items():
-            if measurements:
-                latest[name] = measurements[-1]['value']
-        return latest
+        with cls._lock:
+            return {name: series.latest() for name, series in cls._metrics.items() if series}
 
 def timing_decorator(operation_name: str):
-    """Decorator to measure execution time of functions"""
+    """Decorator to measure execution time of functions (returns func unchanged when timing is disabled)"""
     def decorator(func: Callable) -> Callable:
+        if not TIMING_ENABLED:
+            return func
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            monitor = PerformanceMonitor()
-
-            # Only start timing if not already being measured
-            if operation_name not in monitor._active_operations:
-                monitor.start_operation(operation_name)
-
-                try:
-                    result = func(*args, **kwargs)
-                    return result
-                except Exception as e:
-                    logger.error(f"❌ Error in {operation_name}: {str(e)}")
-                    raise
-                finally:
-                    monitor.end_operation(operation_name)
-            else:
+            operations = PerformanceMonitor.active_operations()
+
+            # Nested or recursive calls of an operation already being measured just call through
+            if operation_name in operations:
+                return func(*args, **kwargs)
+
+            # Keep the start time local; the thread's dict entry only marks the operation as in flight
+            start = operations[operation_name] = time.monotonic_ns()
+            logger.info("⏱️ Starting operation: %s", operation_name)
+            try:
                 return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"❌ Error in {operation_name}: {str(e)}")
+                raise
+            finally:
+                PerformanceMonitor.record_metric(operation_name, (time.monotonic_ns() - start) / 1e9)
+                del operations[operation_name]
 
         return wrapper
     return decorator
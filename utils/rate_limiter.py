@@ -1,23 +1,30 @@
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Unix time at monotonic zero, so one monotonic sample also yields wall-clock time
+_EPOCH_OFFSET = time.time() - time.monotonic_ns() / 1e9
+
 class TokenBucket:
     """Token bucket algorithm implementation for rate limiting."""
     def __init__(self, tokens: int, fill_rate: float):
         self.capacity = tokens
         self.tokens = tokens
         self.fill_rate = fill_rate
-        self.last_update = time.time()
+        # Monotonic nanoseconds: immune to wall-clock adjustments
+        self.last_update = time.monotonic_ns()
 
-    def consume(self, tokens: int = 1) -> bool:
-        now = time.time()
-        # Add tokens based on time passed
-        time_passed = now - self.last_update
-        self.tokens = min(self.capacity, self.tokens + time_passed * self.fill_rate)
+    def consume(self, tokens: int = 1, now: Optional[int] = None) -> bool:
+        """Take tokens if available (now: current time.monotonic_ns(), if already sampled)"""
+        if now is None:
+            now = time.monotonic_ns()
+        # Add tokens based on time passed; a full bucket stays full, so skip the refill math
+        if self.tokens < self.capacity:
+            time_passed = (now - self.last_update) * 1e-9
+            self.tokens = min(self.capacity, self.tokens + time_passed * self.fill_rate)
         self.last_update = now
 
         if self.tokens >= tokens:
@@ -27,24 +34,42 @@ class TokenBucket:
 
 class RateLimiter:
     """Rate limiter using token bucket algorithm."""
-    def __init__(self, tokens: int = 5, fill_rate: float = 0.1):
+    def __init__(self, tokens: int = 5, fill_rate: float = 0.1, max_clients: int = 10_000):
         """
         Initialize rate limiter
         :param tokens: Maximum number of tokens (requests)
         :param fill_rate: Rate at which tokens are added (tokens per second)
+        :param max_clients: Buckets kept before the least recently seen client's is dropped
         """
-        self.buckets: Dict[str, TokenBucket] = defaultdict(
-            lambda: TokenBucket(tokens=tokens, fill_rate=fill_rate)
-        )
+        self.tokens = tokens
+        self.fill_rate = fill_rate
+        self.max_clients = max_clients
+        # LRU of per-client buckets, so many distinct clients cannot grow memory without bound
+        self.buckets: Dict[str, TokenBucket] = OrderedDict()
+
+    def _get_bucket(self, key: str) -> TokenBucket:
+        """Return the client's bucket, creating it and evicting the least recently seen one if needed"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(tokens=self.tokens, fill_rate=self.fill_rate)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket
 
-    def check_rate_limit(self, key: str) -> Tuple[bool, Dict]:
+    def check_rate_limit(self, key: str, now: Optional[int] = None) -> Tuple[bool, Dict]:
         """
         Check if request should be rate limited
         :param key: Identifier for the client (e.g., IP address)
+        :param now: Current time.monotonic_ns(), sampled here if not given
         :return: Tuple of (is_allowed, headers)
         """
-        bucket = self.buckets[key]
-        allowed = bucket.consume()
+        # Read the clock once for both the refill and the reset header
+        if now is None:
+            now = time.monotonic_ns()
+        bucket = self._get_bucket(key)
+        allowed = bucket.consume(now=now)
 
         # Calculate reset time
         tokens_needed = 1 if allowed else 1 - bucket.tokens
@@ -53,7 +78,7 @@ class RateLimiter:
         headers = {
             'X-RateLimit-Limit': str(bucket.capacity),
             'X-RateLimit-Remaining': str(int(bucket.tokens)),
-            'X-RateLimit-Reset': str(int(time.time() + reset_after))
+            'X-RateLimit-Reset': str(int(_EPOCH_OFFSET + now / 1e9 + reset_after))
         }
 
         if not allowed:
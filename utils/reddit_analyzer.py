@@ -1,24 +1,24 @@
 import praw
+import requests
 from datetime import datetime, timezone, timedelta
 import pandas as pd
 import os
+import sys
+import threading
 from prawcore.exceptions import ResponseException, OAuthException
 import logging
 from typing import Optional, Dict, Union, Tuple, List
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class RedditAnalyzer:
     _instance = None
     _initialized = False
-    _reddit_client = None
+    _thread_clients = threading.local()  # praw.Reddit is not thread safe, so each thread gets its own client
     _cache = {}
+    _cache_lock = threading.Lock()  # get_user_data_bulk reads and writes the cache from worker threads
     _cache_timeout = timedelta(minutes=5)
 
     def __new__(cls, client_id: Optional[str] = None, client_secret: Optional[str] = None):
@@ -38,79 +38,101 @@ class RedditAnalyzer:
 
     @property
     def reddit(self):
-        """Lazy initialization of Reddit client"""
-        if self._reddit_client is None:
+        """Lazy initialization of the calling thread's Reddit client"""
+        client = getattr(self._thread_clients, 'client', None)
+        if client is None:
             try:
-                self._reddit_client = praw.Reddit(
+                # Reuse TCP/TLS connections across this thread's requests and users
+                client = praw.Reddit(
                     client_id=self.client_id,
                     client_secret=self.client_secret,
                     user_agent="script:reddit-analyzer:v1.0 (by /u/RedditAnalyzerBot)",
                     check_for_async=False,
-                    read_only=True
+                    read_only=True,
+                    requestor_kwargs={'session': requests.Session()}
                 )
+                self._thread_clients.client = client
                 logger.info("Reddit API connection successful")
             except Exception as e:
                 logger.error(f"Error initializing Reddit client: {str(e)}")
                 raise
-        return self._reddit_client
+        return client
 
     def _get_cached_data(self, username: str) -> tuple:
         """Get cached user data if available and not expired"""
-        if username in self._cache:
-            data, timestamp = self._cache[username]
+        with self._cache_lock:
+            entry = self._cache.get(username)
+        if entry is not None:
+            data, timestamp = entry
             if datetime.now(timezone.utc) - timestamp < self._cache_timeout:
                 return data
         return None
 
     def _cache_data(self, username: str, data: tuple):
         """Cache user data with timestamp"""
-        self._cache[username] = (data, datetime.now(timezone.utc))
-        # Cleanup old cache entries
-        current_time = datetime.now(timezone.utc)
-        self._cache = {
-            k: v for k, v in self._cache.items()
-            if current_time - v[1] < self._cache_timeout
-        }
+        with self._cache_lock:
+            self._cache[username] = (data, datetime.now(timezone.utc))
+            # Cleanup old cache entries
+            current_time = datetime.now(timezone.utc)
+            self._cache = {
+                k: v for k, v in self._cache.items()
+                if current_time - v[1] < self._cache_timeout
+            }
 
     @lru_cache(maxsize=100)
-    def _fetch_user_content(self, username: str, content_type: str = 'comments', limit: int = None) -> List[Dict]:
-        """Cached version of content fetching"""
+    def _fetch_user_content(self, username: str, content_type: str = 'comments', limit: int = None) -> Dict[str, List]:
+        """Cached version of content fetching, as parallel column lists (created_utc in epoch seconds)"""
         user = self.reddit.redditor(username)
-        content_list = []
         one_year_ago = datetime.now(timezone.utc).timestamp() - (365 * 24 * 60 * 60)
 
+        is_comments = content_type == 'comments'
+        created, scores, subreddits, texts, is_self = [], [], [], [], []
+        columns = {'created_utc': created, 'score': scores, 'subreddit': subreddits}
+        if is_comments:
+            columns['body'] = texts
+        else:
+            columns['title'] = texts
+            columns['is_self'] = is_self
+
         try:
-            iterator = user.comments.new(limit=limit) if content_type == 'comments' else user.submissions.new(limit=limit)
+            iterator = user.comments.new(limit=limit) if is_comments else user.submissions.new(limit=limit)
 
             logger.info(f"Fetching {content_type} for user {username}")
             for item in iterator:
                 if item.created_utc < one_year_ago:
                     break
 
-                created_time = datetime.fromtimestamp(item.created_utc, tz=timezone.utc)
-                content_dict = {
-                    'created_utc': created_time,
-                    'score': item.score,
-                    'subreddit': str(item.subreddit),
-                }
-
-                if content_type == 'comments':
-                    content_dict['body'] = item.body
+                created.append(item.created_utc)
+                scores.append(item.score)
+                # Interned: the lru_cache'd columns repeat a handful of subreddit names
+                subreddits.append(sys.intern(str(item.subreddit)))
+                if is_comments:
+                    texts.append(item.body)
                 else:
-                    content_dict['title'] = item.title
-                    content_dict['is_self'] = item.is_self
-
-                content_list.append(content_dict)
+                    texts.append(item.title)
+                    is_self.append(item.is_self)
 
-                if len(content_list) % 100 == 0:
-                    logger.info(f"Fetched {len(content_list)} {content_type}")
+                if len(created) % 100 == 0:
+                    logger.info(f"Fetched {len(created)} {content_type}")
 
-            logger.info(f"Total {content_type} fetched: {len(content_list)}")
-            return content_list
+            logger.info(f"Total {content_type} fetched: {len(created)}")
+            return columns
 
         except Exception as e:
             logger.error(f"Error fetching {content_type}: {str(e)}")
-            return []
+            return {}
+
+    @staticmethod
+    def _content_frame(columns: Dict[str, List]) -> pd.DataFrame:
+        """Build a content DataFrame, converting the epoch created_utc column to UTC datetimes in one pass"""
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame({
+            **columns,
+            'created_utc': pd.to_datetime(columns['created_utc'], unit='s', utc=True),
+            # A user posts in few distinct subreddits, so counting works on integer codes
+            'subreddit': pd.Categorical(columns['subreddit'])
+        })
 
     def get_user_data(self, username: str) -> Tuple[Dict, pd.DataFrame, pd.DataFrame]:
         """Get user data with caching"""
@@ -131,16 +153,12 @@ class RedditAnalyzer:
             }
 
             # Fetch both comments and submissions
-            comments = self._fetch_user_content(username, 'comments')
-            submissions = self._fetch_user_content(username, 'submissions')
+            comments_df = self._content_frame(self._fetch_user_content(username, 'comments'))
+            submissions_df = self._content_frame(self._fetch_user_content(username, 'submissions'))
 
-            logger.info(f"Found {len(comments)} comments and {len(submissions)} submissions")
+            logger.info(f"Found {len(comments_df)} comments and {len(submissions_df)} submissions")
 
-            result = (
-                user_data,
-                pd.DataFrame(comments),
-                pd.DataFrame(submissions)
-            )
+            result = (user_data, comments_df, submissions_df)
 
             self._cache_data(username, result)
             return result
@@ -155,6 +173,25 @@ class RedditAnalyzer:
             logger.error(f"Error analyzing user {username}: {str(e)}")
             raise
 
+    def get_user_data_bulk(self, usernames: List[str], max_workers: int = 8) -> Dict[str, Tuple[Dict, pd.DataFrame, pd.DataFrame]]:
+        """Fetch several users concurrently; users that fail are logged and left out of the result"""
+        usernames = list(dict.fromkeys(usernames))
+        if not usernames:
+            return {}
+
+        def fetch(username: str):
+            try:
+                return self.get_user_data(username)
+            except Exception as e:
+                logger.error(f"Skipping user {username} in bulk fetch: {str(e)}")
+                return None
+
+        # Fetching is network-bound and prawcore releases the GIL while waiting on responses;
+        # each worker thread lazily creates its own client through the reddit property
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(usernames))) as executor:
+            results = executor.map(fetch, usernames)
+            return {username: result for username, result in zip(usernames, results) if result is not None}
+
     def analyze_activity_patterns(self, comments_df: pd.DataFrame, submissions_df: pd.DataFrame = None) -> Dict:
         """Analyze activity patterns from both comments and submissions."""
         if comments_df.empty and (submissions_df is None or submissions_df.empty):
@@ -184,11 +221,13 @@ class RedditAnalyzer:
             valid_dataframes.append(submissions_df['subreddit'])
 
         all_subreddits = pd.concat(valid_dataframes) if valid_dataframes else pd.Series()
+        # One counting pass serves the unique count and the top subreddits
+        subreddit_counts = all_subreddits.value_counts()
 
         # Log activity stats
         logger.info(f"Total comments: {len(comments_df)}")
         logger.info(f"Total submissions: {len(submissions_df) if submissions_df is not None else 0}")
-        logger.info(f"Unique subreddits: {all_subreddits.nunique()}")
+        logger.info(f"Unique subreddits: {len(subreddit_counts)}")
 
         # Calculate average scores
         comments_avg = comments_df['score'].mean() if not comments_df.empty else 0
@@ -206,11 +245,11 @@ class RedditAnalyzer:
         patterns = {
             'total_comments': len(comments_df),
             'total_submissions': len(submissions_df) if submissions_df is not None else 0,
-            'unique_subreddits': all_subreddits.nunique(),
+            'unique_subreddits': len(subreddit_counts),
             'avg_comment_score': comments_avg,
             'avg_submission_score': submissions_avg,
             'activity_hours': all_times.dt.hour.value_counts().to_dict() if not all_times.empty else {},
-            'top_subreddits': all_subreddits.value_counts().head(5).to_dict() if not all_subreddits.empty else {},
+            'top_subreddits': subreddit_counts.head(5).to_dict(),
             'bot_patterns': bot_patterns
         }
 
@@ -254,8 +293,8 @@ class RedditAnalyzer:
                 bot_patterns['rapid_responses'] = 1
 
             # Check for automated timing patterns (posting at exact minute marks)
-            seconds_distribution = comments_df['created_utc'].dt.second.value_counts()
-            if len(seconds_distribution) < 10 and len(comments_df) > 10:
+            distinct_seconds = comments_df['created_utc'].dt.second.nunique()
+            if distinct_seconds < 10 and len(comments_df) > 10:
                 # Comments cluster around specific seconds
                 bot_patterns['automated_timing'] = 1
 
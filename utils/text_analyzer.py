@@ -12,8 +12,6 @@ from datetime import datetime
 from utils.performance_monitor import timing_decorator, performance_monitor
 import json
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TextAnalyzer: